@@ -68,7 +68,8 @@ export async function loadGame(container, gameBaseUrl, callbacks) {
       const url = /^https?:\/\//.test(src) ? src : gameBaseUrl + src
       await loadScript(url, container)
 
-      if (src === 'sprites.js' && window.FA?.assets?.spritesheet) {
+      // sprites.js, or a publish bundle that contains it
+      if (/^(sprites|bundle(-\d+)?)\.js$/.test(src.split('/').pop()) && window.FA?.assets?.spritesheet) {
         window.FA.assets.spritesheet.src = gameBaseUrl + '_spritesheet.png'
       }
     }
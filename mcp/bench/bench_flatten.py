@@ -0,0 +1,98 @@
+"""create_thumbnail layer flatten: opacity LUT + bbox compositing vs the old chain.
+
+  python mcp/bench/bench_flatten.py [runs]
+
+Five layers shaped like the workflow in the create_thumbnail description
+(opaque sky, two partial scenery layers, a faint glow and a dither haze),
+already rendered at the output size. Times applying opacity and compositing
+them, at the default 72x32 and at 1024x1024, with the old
+split/point(lambda)/alpha_composite chain and with _opacity_lut + _flatten,
+and checks both give the same bytes.
+"""
+
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from handlers import thumbnail  # noqa: E402
+
+
+def _layers(w, h):
+    """[(RGBA image, opacity)] for a w x h thumbnail."""
+    sky = Image.new("RGBA", (w, h))
+    draw = ImageDraw.Draw(sky)
+    for y in range(h):
+        draw.line([(0, y), (w - 1, y)], fill=(2 + y * 22 // h, 0, 16 + y * 64 // h, 255))
+
+    hills = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    ImageDraw.Draw(hills).polygon([(0, h), (0, h * 2 // 3), (w // 3, h // 2), (w * 2 // 3, h * 3 // 4), (w, h * 3 // 5), (w, h)],
+                                  fill=(40, 70, 40, 255))
+
+    units = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(units)
+    rng = random.Random(1)
+    for _ in range(12):
+        x, y, s = rng.randrange(w), rng.randrange(h // 2, h), max(2, w // 24)
+        draw.rectangle([x, y, x + s, y + s], fill=(200, 180, 60, 255))
+
+    glow = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    r = max(3, h // 6)
+    ImageDraw.Draw(glow).ellipse([w // 2 - r, h // 4 - r, w // 2 + r, h // 4 + r], fill=(255, 192, 48, 255))
+
+    haze = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    for y in range(h):
+        for x in range(w):
+            if rng.random() < 0.4:
+                haze.putpixel((x, y), (255, 255, 255, 255))
+
+    return [(sky, 1.0), (hills, 1.0), (units, 1.0), (glow, 0.2), (haze, 0.1)]
+
+
+def _old(layers, size):
+    final = Image.new("RGBA", size, (0, 0, 0, 0))
+    for canvas, opacity in layers:
+        if opacity < 1.0:
+            canvas = canvas.copy()  # putalpha works in place
+            canvas.putalpha(canvas.split()[3].point(lambda a, o=opacity: int(a * o)))
+        final = Image.alpha_composite(final, canvas)
+    return final
+
+
+def _new(layers, size):
+    final = Image.new("RGBA", size, (0, 0, 0, 0))
+    for canvas, opacity in layers:
+        if opacity < 1.0:
+            canvas = canvas.copy()
+            canvas.putalpha(canvas.getchannel("A").point(thumbnail._opacity_lut(opacity)))
+        thumbnail._flatten(final, canvas)
+    return final
+
+
+def _ms(fn, layers, size, runs):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(layers, size)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    for size in [(72, 32), (1024, 1024)]:
+        layers = _layers(*size)
+        assert _old(layers, size).tobytes() == _new(layers, size).tobytes(), "flatten output differs"
+        old = _ms(_old, layers, size, runs)
+        new = _ms(_new, layers, size, runs)
+        label = f"{size[0]}x{size[1]}"
+        print(f"{label:<10} old {old:8.3f} ms   new {new:8.3f} ms   ({old / new:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
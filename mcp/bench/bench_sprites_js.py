@@ -0,0 +1,113 @@
+"""sprites.js formats: size and load time, "json" vs "packed".
+
+  python mcp/bench/bench_sprites_js.py [game_path] [runs]
+
+Generates sprites.js both ways from the game's _sprites.json (default: a
+synthetic set of 300 16x16 two-frame sprites) and prints raw and gzipped
+size and the Python generation time. When node is on PATH it also times
+evaluating each script in a fresh context (what a page pays on load —
+"packed" runs its decoder there) and checks that both yield the same
+spriteDefs.
+"""
+
+import gzip
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sprites import generate_sprites_js, migrate_sprite_data  # noqa: E402
+
+# argv: runs, then sprites.js paths. Prints one JSON line: {"ms": [median per file], "equal": bool}
+_NODE_SCRIPT = r"""
+const vm = require('vm'), fs = require('fs')
+const [runs, ...files] = process.argv.slice(1)
+const norm = d => JSON.stringify(Object.fromEntries(Object.entries(d).map(([c, ss]) =>
+  [c, Object.fromEntries(Object.entries(ss).map(([n, s]) => [n, Object.fromEntries(Object.entries(s).sort())]))])))
+const ms = [], defs = []
+for (const f of files) {
+  const script = new vm.Script(fs.readFileSync(f, 'utf8')), times = []
+  let ctx
+  for (let i = 0; i < Number(runs); i++) {
+    ctx = { atob }; ctx.window = ctx; vm.createContext(ctx)
+    const t = process.hrtime.bigint()
+    script.runInContext(ctx)
+    times.push(Number(process.hrtime.bigint() - t) / 1e6)
+  }
+  times.sort((a, b) => a - b)
+  ms.push(times[times.length >> 1])
+  defs.push(norm(ctx.FA.assets.spriteDefs))
+}
+console.log(JSON.stringify({ ms, equal: defs.every(d => d === defs[0]) }))
+"""
+
+
+def _synthetic(count=300, size=16, frames=2):
+    """Blob-shaped sprites with a few colors — runs and flat areas like hand-drawn pixel art."""
+    rng = random.Random(1)
+    data = {}
+    for i in range(count):
+        chars = "123456"[:rng.randint(2, 6)]
+        palette = {ch: "#%06x" % rng.randrange(1 << 24) for ch in chars}
+        cx, cy, r = size / 2, size / 2, rng.uniform(size / 4, size / 2)
+        sprite_frames = []
+        for f in range(frames):
+            rows = []
+            for y in range(size):
+                row = ""
+                for x in range(size):
+                    d = ((x + 0.5 - cx) ** 2 + (y + 0.5 - cy + f) ** 2) ** 0.5
+                    row += "." if d > r else chars[min(int(d / r * len(chars)), len(chars) - 1)]
+                rows.append(row)
+            sprite_frames.append(rows)
+        data.setdefault(f"cat{i % 6}", {})[f"s{i}"] = {"w": size, "h": size, "palette": palette, "frames": sprite_frames, "origin": [0, 0]}
+    return data
+
+
+def main():
+    args = sys.argv[1:]
+    runs = int(args.pop()) if args and args[-1].isdigit() else 30
+    if args:
+        data = migrate_sprite_data(json.loads((Path(args[0]) / "_sprites.json").read_text()))
+        source = f"{args[0]}/_sprites.json"
+    else:
+        data = _synthetic()
+        source = "synthetic"
+    count = sum(len(c) for c in data.values())
+    print(f"{source}: {count} sprites")
+
+    outputs = {}
+    for fmt in ("json", "packed"):
+        t0 = time.perf_counter()
+        js = generate_sprites_js(data, fmt=fmt)
+        gen = (time.perf_counter() - t0) * 1000
+        outputs[fmt] = js
+        raw = js.encode()
+        print(f"  {fmt:<7} {len(raw):>10,} B   gzip {len(gzip.compress(raw)):>9,} B   generate {gen:7.1f} ms")
+
+    node = shutil.which("node")
+    if not node:
+        print("  node not found — load time skipped")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for fmt, js in outputs.items():
+            paths.append(Path(tmp) / f"sprites-{fmt}.js")
+            paths[-1].write_text(js)
+        r = subprocess.run([node, "-e", _NODE_SCRIPT, str(runs), *map(str, paths)], capture_output=True, text=True, check=True)
+    result = json.loads(r.stdout)
+    for fmt, ms in zip(outputs, result["ms"]):
+        print(f"  {fmt:<7} load {ms:7.2f} ms (median of {runs}, node vm)")
+    print(f"  decoded spriteDefs equal: {result['equal']}")
+    if not result["equal"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
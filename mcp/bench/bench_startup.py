@@ -0,0 +1,59 @@
+"""MCP server startup: import time and list_tools latency.
+
+  python mcp/bench/bench_startup.py [runs]
+
+Imports main in fresh interpreters (median of `runs`), once as shipped and
+once with handlers.thumbnail imported eagerly, which shows what the lazy
+create_thumbnail handler saves. Then times handle_list_tools, cold and
+cached. Runs offline — nothing here calls GitHub.
+"""
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+
+def _import_ms(code, cwd, runs):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=cwd, check=True, capture_output=True,
+                       env={**os.environ, "PYTHONPATH": str(SRC), "GH_TOKEN": os.environ.get("GH_TOKEN", "x")})
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    with tempfile.TemporaryDirectory() as cwd:  # platform context, no .forkarcade.json
+        base = _import_ms("pass", cwd, runs)
+        lazy = _import_ms("import main", cwd, runs)
+        eager = _import_ms("import main, handlers.thumbnail", cwd, runs)
+    print(f"{'interpreter only':<30}{base:8.1f} ms")
+    print(f"{'import main (lazy thumbnail)':<30}{lazy:8.1f} ms")
+    print(f"{'import main + thumbnail':<30}{eager:8.1f} ms  (+{eager - lazy:.1f} ms avoided at startup)")
+
+    os.environ.setdefault("GH_TOKEN", "x")
+    import main as server
+
+    async def list_tools():
+        t0 = time.perf_counter()
+        await server.handle_list_tools()
+        return (time.perf_counter() - t0) * 1000
+
+    cold = asyncio.run(list_tools())
+    warm = statistics.median(asyncio.run(list_tools()) for _ in range(50))
+    print(f"{'list_tools cold':<30}{cold:8.3f} ms")
+    print(f"{'list_tools cached':<30}{warm:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Publish-time build: bundle local scripts for a version snapshot.
+
+Consecutive local <script src> tags in index.html are concatenated, in load
+order, into one bundle.js (bundle-2.js, … when a CDN script or the SDK sits in
+between; a lone script keeps its name). sprites.js / maps.js are regenerated
+from _sprites.json / _maps.json with compact JSON. The game directory is not
+touched — build() returns file contents for snapshots.write_snapshot(), so the
+development copies stay readable.
+
+JS is minified with esbuild when it is on PATH; otherwise scripts are only
+concatenated.
+"""
+
+import json
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from maps import generate_maps_js
+from sprites import generate_sprites_js, sprite_format, sprite_store
+
+SDK_FILE = "forkarcade-sdk.js"  # left as its own tag — the platform loader skips it
+MINIFY_TIMEOUT = 30
+
+# <script src="…"></script> with no other attributes — group 1 is the path, group 2 an optional ?query
+_SCRIPT_RE = re.compile(r'<script\s+src="([^"?#]+)(\?[^"#]*)?"\s*>\s*</script>\s*')
+
+
+def _compact(data):
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _sprite_data(game_path):
+    # Migrated, like the sprites.js the store writes; {} (missing/unparsable) -> bundle the file as is
+    return sprite_store(game_path).data or None
+
+
+def _map_data(game_path):
+    try:
+        return json.loads((game_path / "_maps.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+
+# Data files whose JSON payload is regenerated compactly: js name -> (source data loader, generator)
+_DATA_FILES = {
+    "sprites.js": (_sprite_data, lambda game_path, data: (
+        generate_sprites_js(data, fmt="packed") if sprite_format(game_path) == "packed"
+        else generate_sprites_js(data, _compact(data))
+    )),
+    "maps.js": (_map_data, lambda game_path, data: generate_maps_js(data, _compact(data))),
+}
+
+
+def _source(game_path, name):
+    data_file = _DATA_FILES.get(name)
+    if data_file:
+        data = data_file[0](game_path)
+        if data is not None:
+            return data_file[1](game_path, data).encode()
+    return (game_path / name).read_bytes()  # no editable source — bundle the file as it is
+
+
+def _minify(js):
+    """esbuild whitespace + syntax minification (identifiers kept: scripts share globals)."""
+    esbuild = shutil.which("esbuild")
+    if not esbuild:
+        return js, False
+    try:
+        r = subprocess.run(
+            [esbuild, "--minify-whitespace", "--minify-syntax", "--log-level=error"],
+            input=js, capture_output=True, timeout=MINIFY_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Warning: minify skipped: {e}", file=sys.stderr)
+        return js, False
+    if r.returncode != 0:
+        print(f"Warning: minify skipped: {r.stderr.decode(errors='replace').strip()}", file=sys.stderr)
+        return js, False
+    return r.stdout, True
+
+
+def build(game_path, names):
+    """Bundle the local scripts of index.html that are among `names`.
+
+    Returns (contents, stats): contents maps snapshot file name -> bytes
+    (rewritten index.html, bundles, and the remaining files of `names`);
+    stats has scripts, bundles, bytes_before, bytes_after and minified.
+    """
+    game_path = Path(game_path)
+    html = (game_path / "index.html").read_text()
+    bundlable = {n for n in names if n.endswith(".js") and n != SDK_FILE and (game_path / n).is_file()}
+
+    # Split the script tags into runs of consecutive bundlable scripts
+    runs, current, last_end = [], [], None
+    for m in _SCRIPT_RE.finditer(html):
+        name = m.group(1).removeprefix("./")
+        contiguous = last_end is None or not html[last_end:m.start()].strip()
+        if name in bundlable and contiguous and current:
+            current.append((name, m))
+        elif name in bundlable:
+            if current:
+                runs.append(current)
+            current = [(name, m)]
+        elif current:
+            runs.append(current)
+            current = []
+        last_end = m.end()
+    if current:
+        runs.append(current)
+
+    contents = {}
+    stats = {"scripts": 0, "bundles": 0, "bytes_before": 0, "bytes_after": 0, "minified": False}
+    out, pos = [], 0
+    for run in runs:
+        if len(run) == 1:
+            bundle_name = run[0][0]  # nothing to merge — just compacted/minified
+        else:
+            stats["bundles"] += 1
+            n = stats["bundles"]
+            bundle_name = "bundle.js" if n == 1 else f"bundle-{n}.js"
+        parts = []
+        for name, _ in run:
+            stats["bytes_before"] += (game_path / name).stat().st_size
+            # Leading ';' ends a previous file that relied on ASI, and keeps a top-level
+            # 'use strict' from becoming the directive of the whole bundle
+            parts.append(b";// " + name.encode() + b"\n" + _source(game_path, name) + b"\n")
+        js, minified = _minify(b"".join(parts))
+        stats["minified"] = stats["minified"] or minified
+        stats["scripts"] += len(run)
+        stats["bytes_after"] += len(js)
+        contents[bundle_name] = js
+
+        first, last = run[0][1], run[-1][1]
+        trailing = first.group(0)[len(first.group(0).rstrip()):]
+        out.append(html[pos:first.start()])
+        out.append(f'<script src="{bundle_name}"></script>{trailing}')
+        pos = last.end()
+    out.append(html[pos:])
+
+    bundled = {name for run in runs for name, _ in run}
+    for name in names:
+        if name not in bundled and name != "index.html" and (game_path / name).is_file():
+            contents[name] = (game_path / name).read_bytes()
+    contents["index.html"] = "".join(out).encode()
+    return contents, stats
@@ -1,4 +1,7 @@
+import copy
 import json
+import sys
+import threading
 from pathlib import Path
 from github_templates import VALID_CATEGORIES, get_template_assets
 
@@ -17,16 +20,79 @@ def validate_game_path(path_str):
     return game_path
 
 
-def detect_game_context(path=None):
-    config_path = (Path(path) if path else Path.cwd()) / ".forkarcade.json"
-    if config_path.exists():
+class GameContext:
+    """.forkarcade.json of one game directory, cached across calls by mtime/size.
+
+    `config` is shared — treat it as read-only. To change the config, take
+    `editable()`, modify it and `save()` it, so the cached copy never goes stale.
+    """
+
+    def __init__(self, game_path):
+        self.game_path = Path(game_path)
+        self.config_path = self.game_path / ".forkarcade.json"
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._config = {}
+        self.valid = False
+
+    @property
+    def stamp(self):
+        """(mtime_ns, size) of the config file, or None if it doesn't exist."""
         try:
-            config = json.loads(config_path.read_text())
-            if config.get("template"):
-                return config
-        except (json.JSONDecodeError, IOError):
-            pass
-    return None
+            st = self.config_path.stat()
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    @property
+    def exists(self):
+        return self.stamp is not None
+
+    @property
+    def config(self):
+        stamp = self.stamp
+        with self._lock:
+            if stamp != self._stamp:
+                self._config, self.valid = {}, False
+                if stamp is not None:
+                    try:
+                        self._config, self.valid = json.loads(self.config_path.read_text()), True
+                    except (json.JSONDecodeError, IOError) as e:
+                        print(f"Warning: failed to parse {self.config_path}: {e}", file=sys.stderr)
+                self._stamp = stamp
+            return self._config
+
+    def get(self, key, default=None):
+        return self.config.get(key, default)
+
+    def editable(self):
+        return copy.deepcopy(self.config)
+
+    def save(self, config):
+        with self._lock:
+            self.config_path.write_text(json.dumps(config, indent=2) + "\n")
+            self._config, self.valid = config, True
+            self._stamp = self.stamp
+
+
+_contexts = {}
+_contexts_lock = threading.Lock()
+
+
+def game_context(path=None):
+    """GameContext for a game directory (default: cwd). One instance per path."""
+    key = str(Path(path).resolve() if path else Path.cwd())
+    with _contexts_lock:
+        ctx = _contexts.get(key)
+        if ctx is None:
+            ctx = _contexts[key] = GameContext(key)
+        return ctx
+
+
+def detect_game_context(path=None):
+    """Game config dict if path (default: cwd) is a game directory, else None."""
+    config = game_context(path).config
+    return config if config.get("template") else None
 
 
 def get_categories_for_template(template):
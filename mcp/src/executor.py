@@ -0,0 +1,125 @@
+"""Worker pool for MCP tool handlers.
+
+Handlers are plain synchronous functions (subprocess calls, file I/O). They run
+in a bounded thread pool so a long publish_game doesn't stall list_tools or
+cheap calls like get_versions on the stdio event loop.
+
+Env:
+  FA_MCP_WORKERS — pool size (default 4)
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from context import GAMES_DIR
+
+MAX_WORKERS = max(1, int(os.environ.get("FA_MCP_WORKERS", "4")))
+
+# Tools that write to a game directory — serialized per game path
+# (one publish, thumbnail or sprite write per game at a time).
+EXCLUSIVE_TOOLS = {
+    "publish_game", "create_thumbnail", "create_sprite", "create_sprites",
+    "apply_data_patch", "update_sdk", "delete_game",
+}
+
+# Max concurrent calls per tool, across all game paths
+TOOL_LIMITS = {
+    "publish_game": 2,
+    "create_thumbnail": 2,
+    "init_game": 1,
+    "delete_game": 1,
+}
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fa-tool")
+_path_locks = {}
+_tool_semaphores = {}
+_local = threading.local()
+
+
+class Cancelled(BaseException):
+    """Raised inside a handler when its MCP request was cancelled.
+
+    BaseException so handler-level `except Exception` blocks don't swallow it.
+    """
+
+
+def check_cancelled():
+    """Raise Cancelled if the current tool call was cancelled by the client.
+
+    Handlers call this between long steps (e.g. before each subprocess).
+    No-op outside the worker pool.
+    """
+    event = getattr(_local, "cancel", None)
+    if event is not None and event.is_set():
+        raise Cancelled("Request cancelled")
+
+
+def _run_with_cancel(handler, args, cancel):
+    _local.cancel = cancel
+    try:
+        return handler(args)
+    finally:
+        _local.cancel = None
+
+
+def _lock_key(name, args):
+    """Resolved game directory the call writes to. A path and a slug naming the
+    same game (publish_game vs delete_game, ./x vs /abs/x) share one lock."""
+    if name not in EXCLUSIVE_TOOLS:
+        return None
+    path, slug = args.get("path"), args.get("slug")
+    try:
+        if path:
+            return str(Path(path).resolve())
+        if slug:
+            return str((GAMES_DIR / slug).resolve())
+    except (TypeError, ValueError, OSError):
+        return str(path or slug)  # malformed — the handler reports it
+    return None
+
+
+async def call(name, handler, args):
+    """Run handler(args) in the pool, honouring per-tool and per-path limits.
+
+    Locks are released when the worker finishes, not when the awaiting request
+    is cancelled — a cancelled publish keeps the game locked until its current
+    subprocess returns and the handler sees check_cancelled().
+    """
+    loop = asyncio.get_running_loop()
+    held = []
+
+    limit = TOOL_LIMITS.get(name)
+    if limit:
+        sem = _tool_semaphores.setdefault(name, asyncio.Semaphore(limit))
+        await sem.acquire()
+        held.append(sem)
+
+    key = _lock_key(name, args)
+    if key:
+        lock = _path_locks.setdefault(key, asyncio.Lock())
+        try:
+            await lock.acquire()
+        except BaseException:
+            for h in held:
+                h.release()
+            raise
+        held.append(lock)
+
+    def _release(_future):
+        for h in reversed(held):
+            try:
+                loop.call_soon_threadsafe(h.release)
+            except RuntimeError:
+                return  # loop closed at shutdown — nothing is waiting on the locks
+
+    cancel = threading.Event()
+    future = _pool.submit(_run_with_cancel, handler, args, cancel)
+    future.add_done_callback(_release)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        cancel.set()
+        raise
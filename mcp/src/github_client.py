@@ -0,0 +1,265 @@
+"""GitHub REST client — token read once, keep-alive connection pool.
+
+Replaces per-call `gh api` / `gh repo ...` subprocesses. The token comes from
+GH_TOKEN / GITHUB_TOKEN or, failing that, a single `gh auth token` call.
+
+Env:
+  FA_GITHUB_API_URL — API base URL (default https://api.github.com), e.g. a local stub
+"""
+
+import http.client
+import json
+import os
+import queue
+import re
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+API_URL = os.environ.get("FA_GITHUB_API_URL", "https://api.github.com")
+POOL_SIZE = 4  # idle keep-alive connections kept per client
+TIMEOUT = 15
+MAX_RATE_LIMIT_WAIT = 60  # seconds we're willing to sleep for a rate-limit reset
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}  # safe to re-send
+
+
+class GitHubError(RuntimeError):
+    """GitHub answered with an HTTP error status."""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class Response:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers  # lowercase names
+        self.body = body  # bytes
+
+    @property
+    def text(self):
+        return self.body.decode("utf-8")
+
+    def json(self):
+        if not self.body:
+            return None
+        try:
+            return json.loads(self.body)
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"GitHub API returned invalid JSON: {e}")
+
+
+def _read_gh_token():
+    for var in ("GH_TOKEN", "GITHUB_TOKEN"):
+        if os.environ.get(var):
+            return os.environ[var]
+    try:
+        result = subprocess.run(["gh", "auth", "token"], capture_output=True, text=True, timeout=10)
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    print("Warning: no GitHub token (set GH_TOKEN or run `gh auth login`) — unauthenticated requests", file=sys.stderr)
+    return None
+
+
+class GitHubClient:
+    def __init__(self, base_url=API_URL, token=None, pool_size=POOL_SIZE):
+        url = urlsplit(base_url.rstrip("/"))
+        self.scheme = url.scheme
+        self.host = url.netloc
+        self.prefix = url.path
+        self._token = token
+        self._token_lock = threading.Lock()
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._stats = {"requests": 0, "not_modified": 0, "rate_limited": 0}
+        self._stats_lock = threading.Lock()  # pool threads count concurrently
+
+    @property
+    def stats(self):
+        """Request counters (a copy)."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    @property
+    def token(self):
+        if self._token is None:
+            with self._token_lock:
+                if self._token is None:
+                    self._token = _read_gh_token() or ""
+        return self._token
+
+    def _connect(self, reuse=True):
+        if reuse:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, timeout=TIMEOUT)
+
+    def _release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _url(self, path):
+        """Accept 'repos/x', '/repos/x' or an absolute URL from a Link header."""
+        if path.startswith(("http://", "https://")):
+            parts = urlsplit(path)
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            if self.prefix and path.startswith(self.prefix):
+                path = path[len(self.prefix):]
+        if not path.startswith("/"):
+            path = "/" + path
+        return self.prefix + path
+
+    def _send(self, method, url, body, headers):
+        """One HTTP exchange. Network failures raise RuntimeError, like HTTP errors do.
+
+        An idle keep-alive connection may already be closed by the server.
+        Idempotent requests then get one retry on a fresh connection. Other
+        methods (POST, PATCH) always use a fresh connection and are never
+        retried, so they can't run twice.
+        """
+        self._count("requests")
+        idempotent = method in IDEMPOTENT_METHODS
+        for attempt in range(2 if idempotent else 1):
+            conn = self._connect(reuse=idempotent and attempt == 0)
+            try:
+                conn.request(method, url, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                conn.close()
+                if idempotent and attempt == 0:
+                    continue
+                raise RuntimeError(f"GitHub API request failed: {method} {url}: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise RuntimeError(f"GitHub API request failed: {method} {url}: {e}") from e
+            except Exception:
+                conn.close()
+                raise
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            if resp.status == 304:
+                self._count("not_modified")
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return Response(resp.status, resp_headers, data)
+
+    def _rate_limit_wait(self, resp):
+        """Seconds to wait before retrying a rate-limited response, or None."""
+        if resp.status not in (403, 429):
+            return None
+        if "retry-after" in resp.headers:
+            try:
+                return int(resp.headers["retry-after"])
+            except ValueError:
+                return None
+        if resp.headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-reset" in resp.headers:
+            try:
+                return max(0, int(resp.headers["x-ratelimit-reset"]) - int(time.time())) + 1
+            except ValueError:
+                return None
+        return None
+
+    def request(self, method, path, data=None, headers=None):
+        """Send a request. Returns Response; raises GitHubError on HTTP >= 400.
+
+        Rate-limited responses (403/429 with Retry-After or an exhausted
+        X-RateLimit-Remaining) are retried once if the reset is close enough.
+        """
+        req_headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "User-Agent": "forkarcade-mcp",
+        }
+        if self.token:
+            req_headers["Authorization"] = f"Bearer {self.token}"
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode()
+            req_headers["Content-Type"] = "application/json"
+        req_headers.update(headers or {})
+        url = self._url(path)
+
+        resp = self._send(method, url, body, req_headers)
+        wait = self._rate_limit_wait(resp)
+        if wait is not None:
+            self._count("rate_limited")
+        if wait is not None and wait <= MAX_RATE_LIMIT_WAIT:
+            print(f"Warning: GitHub rate limit hit, retrying {path} in {wait}s", file=sys.stderr)
+            time.sleep(wait)
+            resp = self._send(method, url, body, req_headers)
+
+        if resp.status >= 400:
+            try:
+                message = json.loads(resp.body).get("message", "")
+            except (ValueError, AttributeError):
+                message = resp.body[:200].decode("utf-8", "replace")
+            raise GitHubError(resp.status, f"GitHub API error: HTTP {resp.status} {message}".rstrip(), resp.headers)
+        return resp
+
+    def get_json(self, path):
+        return self.request("GET", path).json()
+
+    def paginate(self, path):
+        """Yield items across pages, following Link rel="next".
+
+        Search endpoints wrap results in {"items": [...]}; both shapes are handled.
+        """
+        url = path
+        while url:
+            resp = self.request("GET", url)
+            page = resp.json()
+            yield from (page.get("items", []) if isinstance(page, dict) else page or [])
+            match = re.search(r'<([^>]+)>;\s*rel="next"', resp.headers.get("link", ""))
+            url = match.group(1) if match else None
+
+    def post(self, path, data=None):
+        return self.request("POST", path, data).json()
+
+    def patch(self, path, data):
+        return self.request("PATCH", path, data).json()
+
+    def put(self, path, data):
+        return self.request("PUT", path, data).json()
+
+    def delete(self, path):
+        return self.request("DELETE", path).json()
+
+    def add_topics(self, repo, names):
+        """Add topics to a repo (like `gh repo edit --add-topic`), keeping existing ones."""
+        current = self.get_json(f"/repos/{repo}/topics").get("names", [])
+        merged = current + [n for n in names if n not in current]
+        if merged != current:
+            self.put(f"/repos/{repo}/topics", {"names": merged})
+        return merged
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def client():
+    """Shared client for the MCP server process."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GitHubClient()
+    return _client
@@ -5,50 +5,140 @@ The template key is the other topic (e.g. 'strategy-rpg', 'roguelike').
 Template-specific data lives in each template repo:
   _assets.json — sprite palette and categories
   _prompt.md   — game design prompt for Claude
+
+Responses are also kept in an on-disk cache shared by all MCP servers
+(one per game directory). Entries are revalidated with ETag / Last-Modified,
+so a restart costs a few cheap 304s, and stale data is served when offline.
 """
 
 import base64
+import hashlib
 import json
-import subprocess
+import os
 import sys
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import github_client
 
 ORG = "ForkArcade"
 TEMPLATE_TOPIC = "forkarcade-template"
 
 VALID_CATEGORIES = ["tiles", "enemies", "items", "player", "effects", "terrain", "units", "ui"]
 
-# In-memory cache
-_cache = {"templates": None, "templates_ts": 0, "assets": {}, "assets_ts": {}, "prompts": {}, "prompts_ts": {}, "styles": {}, "styles_ts": {}}
+# In-memory cache: kind -> key -> (value, fetched_ts).
+# Expired entries are served while one background refresh runs (stale-while-revalidate);
+# concurrent misses for the same key share a single fetch (single-flight).
+_cache = {"templates": {}, "assets": {}, "prompts": {}, "styles": {}}
 _CACHE_TTL = 300  # 5 minutes
+_FANOUT = 8  # max concurrent per-template fetches
+_cache_lock = threading.Lock()
+_inflight = {}  # (kind, key) -> Future
+_refresh_pool = ThreadPoolExecutor(max_workers=_FANOUT, thread_name_prefix="fa-gh-refresh")
+_stats = {"hits": 0, "misses": 0, "stale": 0, "coalesced": 0, "refreshes": 0, "refresh_errors": 0}
+
+# On-disk cache under the platform root (override with FA_CACHE_DIR)
+_DISK_CACHE_DIR = Path(os.environ.get("FA_CACHE_DIR") or Path(__file__).resolve().parent.parent.parent / ".cache") / "github"
+_INDEX_PATH = _DISK_CACHE_DIR / "templates-index.json"
+_INDEX_VERSION = 1  # bump when the index entry shape changes
+
+
+def _gh_request(path, headers=None):
+    """GET a GitHub API path. Returns (status, headers, body text); 304 is not an error."""
+    resp = github_client.client().request("GET", path, headers=headers)
+    return resp.status, resp.headers, resp.text
 
 
 def _gh_api(path):
-    """Call GitHub API via gh CLI."""
-    result = subprocess.run(
-        ["gh", "api", path],
-        capture_output=True, text=True, timeout=15
-    )
-    if result.returncode != 0:
-        raise RuntimeError(f"GitHub API error: {result.stderr.strip()}")
+    """Call GitHub API (uncached). Returns parsed JSON."""
+    return github_client.client().get_json(path)
+
+
+def _disk_path(path):
+    return _DISK_CACHE_DIR / (hashlib.sha1(path.encode()).hexdigest() + ".json")
+
+
+def _disk_read(path):
+    try:
+        entry = json.loads(_disk_path(path).read_text())
+        return entry if entry.get("path") == path else None
+    except (OSError, ValueError):
+        return None
+
+
+def _disk_write_json(target, data):
+    """Atomic write — several MCP servers may share the cache directory."""
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, target)
+    except OSError as e:
+        print(f"Warning: failed to write GitHub cache {target.name}: {e}", file=sys.stderr)
+
+
+def _disk_write(path, entry):
+    _disk_write_json(_disk_path(path), entry)
+
+
+def _gh_cached(path):
+    """GET a GitHub API path through the on-disk cache. Returns parsed JSON.
+
+    Sends If-None-Match / If-Modified-Since when a cached copy exists; a 304
+    reuses the cached body. If GitHub can't be reached (or rate-limits us),
+    the stale copy is served. A 404 is authoritative and is not masked.
+    """
+    entry = _disk_read(path)
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("lastModified"):
+        headers["If-Modified-Since"] = entry["lastModified"]
+
+    try:
+        status, resp_headers, body = _gh_request(path, headers)
+    except Exception as e:
+        if entry and getattr(e, "status", None) != 404:
+            print(f"Warning: GitHub request failed, using cached {path}: {e}", file=sys.stderr)
+            return json.loads(entry["body"])
+        raise
+
+    if status == 304 and entry:
+        return json.loads(entry["body"])
+
     try:
-        return json.loads(result.stdout)
+        data = json.loads(body)
     except json.JSONDecodeError as e:
         raise RuntimeError(f"GitHub API returned invalid JSON for {path}: {e}")
+    _disk_write(path, {
+        "path": path,
+        "etag": resp_headers.get("etag"),
+        "lastModified": resp_headers.get("last-modified"),
+        "fetched": time.time(),
+        "body": body,
+    })
+    return data
 
 
-def _fetch_templates():
-    """Fetch template repos from GitHub API."""
-    now = time.time()
-    if _cache["templates"] and (now - _cache["templates_ts"]) < _CACHE_TTL:
-        return _cache["templates"]
+def _scan_template_repos():
+    """Yield template repos via topic-scoped search, following pagination.
+
+    Only forkarcade-template repos are returned, so the (much larger) set of
+    game repos in the org is never listed.
+    """
+    query = f"org:{ORG}+topic:{TEMPLATE_TOPIC}"
+    for repo in github_client.client().paginate(f"/search/repositories?q={query}&per_page=100"):
+        if TEMPLATE_TOPIC in repo.get("topics", []):
+            yield repo
 
-    repos = _gh_api(f"/orgs/{ORG}/repos?per_page=100")
+
+def _build_index():
+    """Build the template index: key -> {key, repo, name, description, styles, defaultStyle}."""
     templates = []
-    for repo in repos:
+    for repo in _scan_template_repos():
         topics = repo.get("topics", [])
-        if TEMPLATE_TOPIC not in topics:
-            continue
         key = None
         for t in topics:
             if t != TEMPLATE_TOPIC:
@@ -62,52 +152,171 @@ def _fetch_templates():
             "name": repo.get("description") or repo["name"],
             "description": repo.get("description") or "",
         })
+    templates.sort(key=lambda t: t["key"])
 
-    # Enrich with style preset keys (if _styles.json exists)
-    for tmpl in templates:
-        styles_data = get_template_styles(tmpl["key"], repo=tmpl["repo"])
+    # Enrich with style preset keys (if _styles.json exists) — fetched concurrently,
+    # a failed fetch only leaves that template without styles
+    with ThreadPoolExecutor(max_workers=_FANOUT) as pool:
+        all_styles = list(pool.map(lambda t: get_template_styles(t["key"], repo=t["repo"]), templates))
+    for tmpl, styles_data in zip(templates, all_styles):
         if styles_data:
             tmpl["styles"] = list(styles_data.get("styles", {}).keys())
             tmpl["defaultStyle"] = styles_data.get("default")
         else:
             tmpl["styles"] = []
             tmpl["defaultStyle"] = None
+    return {t["key"]: t for t in templates}
+
+
+def _read_index_file():
+    """Return (index, built_ts) from disk, or (None, 0) if missing or from another _INDEX_VERSION."""
+    try:
+        data = json.loads(_INDEX_PATH.read_text())
+    except (OSError, ValueError):
+        return None, 0
+    if data.get("version") != _INDEX_VERSION:
+        return None, 0
+    return data.get("templates"), data.get("built", 0)
+
+
+def _load(kind, key, loader, future):
+    """Run loader and publish its result to the cache and to waiters on future."""
+    try:
+        value = loader()
+    except BaseException as e:
+        with _cache_lock:
+            _inflight.pop((kind, key), None)
+        future.set_exception(e)
+        return
+    with _cache_lock:
+        if value is not None:
+            _cache[kind][key] = (value, time.time())
+        _inflight.pop((kind, key), None)
+    future.set_result(value)
+
+
+def _refresh(kind, key, loader, future):
+    _load(kind, key, loader, future)
+    error = future.exception()
+    if error is not None:
+        with _cache_lock:
+            _stats["refresh_errors"] += 1
+        print(f"Warning: background refresh of {kind}/{key} failed: {error}", file=sys.stderr)
+
+
+def _cached(kind, key, loader):
+    """Cached value for (kind, key), calling loader() on a miss.
+
+    Fresh entry: returned as is. Expired entry: returned immediately while a
+    background refresh runs. Missing entry: fetched in this thread, and any
+    concurrent callers for the same key wait on that one fetch. None results
+    are not cached. Loader exceptions propagate to everyone waiting on a miss.
+    """
+    with _cache_lock:
+        entry = _cache[kind].get(key)
+        future = _inflight.get((kind, key))
+        if entry and (time.time() - entry[1]) < _CACHE_TTL:
+            _stats["hits"] += 1
+            return entry[0]
+        if entry:
+            _stats["stale"] += 1
+            if future is None:
+                _stats["refreshes"] += 1
+                future = _inflight[(kind, key)] = Future()
+                _refresh_pool.submit(_refresh, kind, key, loader, future)
+            return entry[0]
+        owner = future is None
+        if owner:
+            _stats["misses"] += 1
+            future = _inflight[(kind, key)] = Future()
+        else:
+            _stats["coalesced"] += 1
+    if owner:
+        _load(kind, key, loader, future)
+    return future.result()
+
+
+def cache_stats():
+    """Cache counters plus GitHub requests made by this process."""
+    with _cache_lock:
+        stats = dict(_stats)
+    stats.update(github_client.client().stats)
+    return stats
+
+
+def _load_index():
+    """Template index from disk if fresh, else rebuilt from GitHub (stale disk copy if offline)."""
+    index, built = _read_index_file()
+    if index is not None and (time.time() - built) < _CACHE_TTL:
+        return index
+    try:
+        fresh = _build_index()
+    except Exception as e:
+        if index is None:
+            raise
+        print(f"Warning: template discovery failed, using cached index: {e}", file=sys.stderr)
+        return index
+    _disk_write_json(_INDEX_PATH, {"version": _INDEX_VERSION, "built": time.time(), "templates": fresh})
+    return fresh
+
+
+def _fetch_templates():
+    """Template index (dict keyed by template key), from memory, disk or GitHub.
 
-    _cache["templates"] = templates
-    _cache["templates_ts"] = now
-    return templates
+    The index is persisted as a versioned artifact shared by all MCP servers;
+    a stale one is served if GitHub can't be reached.
+    """
+    return _cached("templates", None, _load_index)
 
 
 def list_templates():
     """List all available templates from GitHub."""
-    return _fetch_templates()
+    return list(_fetch_templates().values())
+
+
+def warm_templates():
+    """Fetch the template list plus every template's _assets.json, _styles.json
+    and _prompt.md concurrently, filling the memory and disk caches.
+
+    Safe to run in a background thread at server startup; failures are logged
+    and leave the affected entries to be fetched on demand.
+    """
+    try:
+        keys = list(_fetch_templates())
+    except Exception as e:
+        print(f"Warning: template warm-up failed: {e}", file=sys.stderr)
+        return 0
+    jobs = [(fetch, key) for key in keys for fetch in (get_template_assets, get_template_prompt)]
+    with ThreadPoolExecutor(max_workers=_FANOUT) as pool:
+        list(pool.map(lambda job: job[0](job[1]), jobs))
+    return len(keys)
 
 
 def get_template(key):
     """Get a specific template by key. Returns dict or None."""
-    for t in _fetch_templates():
-        if t["key"] == key:
-            return t
-    return None
+    return _fetch_templates().get(key)
 
 
-def get_template_assets(key):
-    """Fetch _assets.json from a template repo. Returns dict or None."""
-    now = time.time()
-    if key in _cache["assets"] and (now - _cache["assets_ts"].get(key, 0)) < _CACHE_TTL:
-        return _cache["assets"][key]
+def _fetch_repo_file(key, filename, repo=None):
+    """Decoded contents of a file in a template repo, or None for an unknown template."""
+    if not repo:
+        tmpl = get_template(key)
+        if not tmpl:
+            return None
+        repo = tmpl["repo"]
+    data = _gh_cached(f"/repos/{repo}/contents/{filename}")
+    return base64.b64decode(data["content"]).decode("utf-8")
+
+
+def _fetch_repo_json(key, filename, repo=None):
+    content = _fetch_repo_file(key, filename, repo)
+    return json.loads(content) if content is not None else None
 
-    tmpl = get_template(key)
-    if not tmpl:
-        return None
 
+def get_template_assets(key):
+    """Fetch _assets.json from a template repo. Returns dict or None."""
     try:
-        data = _gh_api(f"/repos/{tmpl['repo']}/contents/_assets.json")
-        content = base64.b64decode(data["content"]).decode("utf-8")
-        assets = json.loads(content)
-        _cache["assets"][key] = assets
-        _cache["assets_ts"][key] = now
-        return assets
+        return _cached("assets", key, lambda: _fetch_repo_json(key, "_assets.json"))
     except Exception as e:
         print(f"Warning: failed to fetch assets for {key}: {e}", file=sys.stderr)
         return None
@@ -120,23 +329,8 @@ def get_template_styles(key, repo=None):
         key: Template key (e.g. 'space-combat').
         repo: Optional repo full_name to avoid recursive get_template() call.
     """
-    now = time.time()
-    if key in _cache["styles"] and (now - _cache["styles_ts"].get(key, 0)) < _CACHE_TTL:
-        return _cache["styles"][key]
-
-    if not repo:
-        tmpl = get_template(key)
-        if not tmpl:
-            return None
-        repo = tmpl["repo"]
-
     try:
-        data = _gh_api(f"/repos/{repo}/contents/_styles.json")
-        content = base64.b64decode(data["content"]).decode("utf-8")
-        styles = json.loads(content)
-        _cache["styles"][key] = styles
-        _cache["styles_ts"][key] = now
-        return styles
+        return _cached("styles", key, lambda: _fetch_repo_json(key, "_styles.json", repo))
     except Exception as e:
         print(f"Warning: failed to fetch styles for {key}: {e}", file=sys.stderr)
         return None
@@ -144,20 +338,8 @@ def get_template_styles(key, repo=None):
 
 def get_template_prompt(key):
     """Fetch _prompt.md from a template repo. Returns string or None."""
-    now = time.time()
-    if key in _cache["prompts"] and (now - _cache["prompts_ts"].get(key, 0)) < _CACHE_TTL:
-        return _cache["prompts"][key]
-
-    tmpl = get_template(key)
-    if not tmpl:
-        return None
-
     try:
-        data = _gh_api(f"/repos/{tmpl['repo']}/contents/_prompt.md")
-        content = base64.b64decode(data["content"]).decode("utf-8")
-        _cache["prompts"][key] = content
-        _cache["prompts_ts"][key] = now
-        return content
+        return _cached("prompts", key, lambda: _fetch_repo_file(key, "_prompt.md"))
     except Exception as e:
         print(f"Warning: failed to fetch prompt for {key}: {e}", file=sys.stderr)
         return None
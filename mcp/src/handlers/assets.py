@@ -1,11 +1,10 @@
 import json
 import re
-import sys
 from pathlib import Path
 
 from github_templates import VALID_CATEGORIES, get_template, get_template_assets
-from sprites import generate_sprites_js, generate_preview_html, migrate_sprite_data
-from context import validate_game_path, detect_game_context, get_categories_for_template
+from sprites import generate_preview_html, migrate_sprite_data, sprite_store
+from context import validate_game_path, detect_game_context, game_context, get_categories_for_template
 
 
 def get_asset_guide(args):
@@ -40,57 +39,80 @@ def get_asset_guide(args):
     output += "} else {\n  ctx.fillText(enemy.char, sx + T/2, sy + T/2)\n}\n"
     output += "// Animation: Math.floor(t / 200) % spriteFrames(sprite)\n```\n"
     output += "\nUse the `create_sprite` tool to create sprites. Call multiple times with `frame` param to add animation frames.\n"
+    output += "Use `create_sprites` to write many sprites (all frames each) in one call.\n"
     return output
 
 
-def create_sprite(args):
-    game_path = validate_game_path(args["path"])
-    category = args["category"]
-    sprite_name = args["name"]
-    palette = args["palette"]
-    pixels = args["pixels"]
-    frame_index = args.get("frame")
-    origin = args.get("origin", [0, 0])
-    json_path = game_path / "_sprites.json"
+def _allowed_categories(game_path):
+    game_ctx = detect_game_context(game_path)
+    if game_ctx:
+        return get_categories_for_template(game_ctx["template"]), game_ctx["template"]
+    return VALID_CATEGORIES, "all"
+
 
-    game_ctx = detect_game_context(args["path"])
-    allowed = get_categories_for_template(game_ctx["template"]) if game_ctx else VALID_CATEGORIES
+def _category_error(category, allowed, ctx_name):
     if category not in allowed:
-        ctx_name = game_ctx["template"] if game_ctx else "all"
-        return json.dumps({"error": f"Invalid category: {category}. Valid for {ctx_name}: {', '.join(allowed)}"})
+        return f"Invalid category: {category}. Valid for {ctx_name}: {', '.join(allowed)}"
+    return None
 
+
+def _pixels_error(pixels, palette):
     if not isinstance(pixels, list) or len(pixels) == 0:
-        return json.dumps({"error": "pixels must be a non-empty array of strings"})
-    h = len(pixels)
+        return "pixels must be a non-empty array of strings"
+    if not isinstance(pixels[0], str):
+        return "Row 0 must be a string"
     w = len(pixels[0])
-    for i in range(h):
+    for i in range(len(pixels)):
         if not isinstance(pixels[i], str):
-            return json.dumps({"error": f"Row {i} must be a string"})
+            return f"Row {i} must be a string"
         if len(pixels[i]) != w:
-            return json.dumps({"error": f"Row {i} has {len(pixels[i])} chars, expected {w}"})
+            return f"Row {i} has {len(pixels[i])} chars, expected {w}"
         for ch in pixels[i]:
             if ch != "." and ch not in palette:
-                return json.dumps({"error": f"Character '{ch}' in row {i} not found in palette"})
+                return f"Character '{ch}' in row {i} not found in palette"
+    return None
+
 
+def _palette_error(palette):
+    if not isinstance(palette, dict):
+        return "palette must be an object"
     for key, val in palette.items():
         if not isinstance(val, str) or not re.match(r"^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})$", val):
-            return json.dumps({"error": f"Invalid color '{val}' for palette key '{key}'"})
+            return f"Invalid color '{val}' for palette key '{key}'"
+    return None
 
+
+def _origin_error(origin):
     if not isinstance(origin, list) or len(origin) != 2 or not all(isinstance(v, int) for v in origin):
-        return json.dumps({"error": "origin must be [ox, oy] — two integers"})
+        return "origin must be [ox, oy] — two integers"
+    return None
 
-    data = {}
-    if json_path.exists():
-        try:
-            data = migrate_sprite_data(json.loads(json_path.read_text()))
-        except Exception as e:
-            print(f"Warning: failed to parse {json_path}: {e}", file=sys.stderr)
-            data = {}
 
-    if category not in data:
-        data[category] = {}
+def create_sprite(args):
+    game_path = validate_game_path(args["path"])
+    category = args["category"]
+    sprite_name = args["name"]
+    palette = args["palette"]
+    pixels = args["pixels"]
+    frame_index = args.get("frame")
+    origin = args.get("origin", [0, 0])
+
+    allowed, ctx_name = _allowed_categories(game_path)
+    error = _category_error(category, allowed, ctx_name) or _pixels_error(pixels, palette) \
+        or _palette_error(palette) or _origin_error(origin)
+    if error:
+        return json.dumps({"error": error})
+    h = len(pixels)
+    w = len(pixels[0])
 
-    existing = data[category].get(sprite_name)
+    store = sprite_store(game_path)
+    with store.lock:
+        return _put_sprite_frame(store, category, sprite_name, palette, pixels, frame_index, origin, w, h)
+
+
+def _put_sprite_frame(store, category, sprite_name, palette, pixels, frame_index, origin, w, h):
+    data = store.data
+    existing = data.get(category, {}).get(sprite_name)
     if existing:
         if existing["w"] != w or existing["h"] != h:
             return json.dumps({"error": f"Frame size {w}x{h} doesn't match existing sprite {existing['w']}x{existing['h']}"})
@@ -108,10 +130,10 @@ def create_sprite(args):
         empty = ["." * w] * h
         frames = [empty] * (idx + 1)
         frames[idx] = pixels
-        data[category][sprite_name] = {"w": w, "h": h, "palette": palette, "origin": origin, "frames": frames}
+        data.setdefault(category, {})[sprite_name] = {"w": w, "h": h, "palette": palette, "origin": origin, "frames": frames}
 
-    json_path.write_text(json.dumps(data, indent=2) + "\n")
-    (game_path / "sprites.js").write_text(generate_sprites_js(data))
+    store.changed(category, sprite_name)
+    store.save()
 
     sprite = data[category][sprite_name]
     frame_count = len(sprite["frames"])
@@ -125,59 +147,117 @@ def create_sprite(args):
     })
 
 
+def _batch_entry_error(entry, allowed, ctx_name, seen):
+    """Validation error for one create_sprites entry, or None."""
+    if not isinstance(entry, dict):
+        return "entry must be an object"
+    for field in ("category", "name", "palette", "frames"):
+        if field not in entry:
+            return f"missing '{field}'"
+    category, name, palette, frames = entry["category"], entry["name"], entry["palette"], entry["frames"]
+    for field, value in (("category", category), ("name", name)):
+        if not isinstance(value, str):
+            return f"'{field}' must be a string"
+    error = _category_error(category, allowed, ctx_name) or _palette_error(palette) \
+        or _origin_error(entry.get("origin", [0, 0]))
+    if error:
+        return error
+    if (category, name) in seen:
+        return f"duplicate sprite {category}/{name} in batch"
+    if not isinstance(frames, list) or len(frames) == 0:
+        return "frames must be a non-empty array of pixel grids"
+    for f, pixels in enumerate(frames):
+        error = _pixels_error(pixels, palette)
+        if error:
+            return f"Frame {f}: {error}"
+        if (len(pixels[0]), len(pixels)) != (len(frames[0][0]), len(frames[0])):
+            return f"Frame {f} is {len(pixels[0])}x{len(pixels)}, frame 0 is {len(frames[0][0])}x{len(frames[0])}"
+    return None
+
+
+def create_sprites(args):
+    """Create or replace many sprites in one call — validated up front, written once."""
+    game_path = validate_game_path(args["path"])
+    entries = args.get("sprites")
+    if not isinstance(entries, list) or len(entries) == 0:
+        return json.dumps({"error": "sprites must be a non-empty array of {category, name, palette, frames, origin}"})
+
+    allowed, ctx_name = _allowed_categories(game_path)
+    store = sprite_store(game_path)
+    with store.lock:
+        data = store.data
+        errors = []
+        seen = set()
+        for i, entry in enumerate(entries):
+            error = _batch_entry_error(entry, allowed, ctx_name, seen)
+            if error:
+                label = f"{entry.get('category')}/{entry.get('name')}" if isinstance(entry, dict) else "?"
+                errors.append({"index": i, "sprite": label, "error": error})
+            else:
+                seen.add((entry["category"], entry["name"]))
+        if errors:
+            return json.dumps({"error": f"{len(errors)} of {len(entries)} sprites invalid — nothing written", "errors": errors})
+
+        with store.batch():
+            for entry in entries:
+                frames = entry["frames"]
+                data.setdefault(entry["category"], {})[entry["name"]] = {
+                    "w": len(frames[0][0]), "h": len(frames[0]),
+                    "palette": entry["palette"],
+                    "origin": entry.get("origin", [0, 0]),
+                    "frames": frames,
+                }
+                store.changed(entry["category"], entry["name"])
+            store.save()
+
+        return json.dumps({
+            "ok": True,
+            "message": f"{len(entries)} sprites written ({sum(len(e['frames']) for e in entries)} frames)",
+            "sprites": [f"{e['category']}/{e['name']}" for e in entries],
+            "total_sprites": sum(len(cat) for cat in data.values()),
+        })
+
+
 def validate_assets(args):
     game_path = validate_game_path(args["path"])
     json_path = game_path / "_sprites.json"
     template = args.get("template")
 
     if not template:
-        game_ctx = detect_game_context(str(game_path))
-        if game_ctx:
-            template = game_ctx["template"]
-    if not template:
-        target_config = game_path / ".forkarcade.json"
-        if target_config.exists():
-            try:
-                template = json.loads(target_config.read_text()).get("template")
-            except Exception:
-                pass
+        template = game_context(game_path).get("template")
 
     guide = get_template_assets(template or "")
     if not guide:
         return json.dumps({"error": "Cannot detect template type. Pass template parameter explicitly."})
 
-    data = {}
-    if json_path.exists():
-        try:
-            data = migrate_sprite_data(json.loads(json_path.read_text()))
-        except Exception as e:
-            print(f"Warning: failed to parse {json_path}: {e}", file=sys.stderr)
-            data = {}
-
     sprites_in_html = False
     index_html = game_path / "index.html"
     if index_html.exists():
         sprites_in_html = "sprites.js" in index_html.read_text()
 
-    report = {}
-    total_found = 0
-    total_required = 0
-    format_errors = []
-    for cat, info in guide["categories"].items():
-        found = list(data.get(cat, {}).keys())
-        missing = [s for s in info["sprites"] if s not in found]
-        report[cat] = {"found": found, "missing": missing}
-        total_found += len(found)
-        total_required += len(info["sprites"])
-
-    for cat, sprites in data.items():
-        for name, s in sprites.items():
-            if not isinstance(s.get("frames"), list) or len(s["frames"]) == 0:
-                format_errors.append(f"{cat}/{name}: missing or empty frames")
-            elif not all(isinstance(f, list) for f in s["frames"]):
-                format_errors.append(f"{cat}/{name}: frames contains non-array entries")
-            if not isinstance(s.get("origin"), list) or len(s.get("origin", [])) != 2:
-                format_errors.append(f"{cat}/{name}: missing or invalid origin")
+    # Shared with concurrent create_sprite(s) calls on this game — read under its lock
+    store = sprite_store(game_path)
+    with store.lock:
+        data = store.data
+        report = {}
+        total_found = 0
+        total_required = 0
+        format_errors = []
+        for cat, info in guide["categories"].items():
+            found = list(data.get(cat, {}).keys())
+            missing = [s for s in info["sprites"] if s not in found]
+            report[cat] = {"found": found, "missing": missing}
+            total_found += len(found)
+            total_required += len(info["sprites"])
+
+        for cat, sprites in data.items():
+            for name, s in sprites.items():
+                if not isinstance(s.get("frames"), list) or len(s["frames"]) == 0:
+                    format_errors.append(f"{cat}/{name}: missing or empty frames")
+                elif not all(isinstance(f, list) for f in s["frames"]):
+                    format_errors.append(f"{cat}/{name}: frames contains non-array entries")
+                if not isinstance(s.get("origin"), list) or len(s.get("origin", [])) != 2:
+                    format_errors.append(f"{cat}/{name}: missing or invalid origin")
 
     return json.dumps({
         "template": template,
@@ -1,82 +1,95 @@
+import functools
+import hashlib
+import io
 import json
 import math
+import os
 import random
 import subprocess
 import sys
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from PIL import Image, ImageDraw
-from context import validate_game_path
-from sprites import migrate_sprite_data
+from PIL import Image, ImageChops, ImageDraw
+from context import validate_game_path, game_context, PLATFORM_ROOT
+from sprites import sprite_store
+import pixel_font
+import push_queue
+
+try:
+    import numpy as np
+except ImportError:  # optional — falls back to the Pillow-only backend
+    np = None
 
 DEFAULT_THUMB_W, DEFAULT_THUMB_H = 72, 32
 
-# Built-in 3x5 pixel font (each glyph is a list of 5 row strings, 3 chars wide)
-PIXEL_FONT = {
-    "A": [".1.", "1.1", "111", "1.1", "1.1"],
-    "B": ["11.", "1.1", "11.", "1.1", "11."],
-    "C": ["111", "1..", "1..", "1..", "111"],
-    "D": ["11.", "1.1", "1.1", "1.1", "11."],
-    "E": ["111", "1..", "111", "1..", "111"],
-    "F": ["111", "1..", "111", "1..", "1.."],
-    "G": ["111", "1..", "1.1", "1.1", "111"],
-    "H": ["1.1", "1.1", "111", "1.1", "1.1"],
-    "I": ["111", ".1.", ".1.", ".1.", "111"],
-    "J": ["111", "..1", "..1", "1.1", "111"],
-    "K": ["1.1", "1.1", "11.", "1.1", "1.1"],
-    "L": ["1..", "1..", "1..", "1..", "111"],
-    "M": ["1.1", "111", "111", "1.1", "1.1"],
-    "N": ["1.1", "111", "111", "111", "1.1"],
-    "O": ["111", "1.1", "1.1", "1.1", "111"],
-    "P": ["111", "1.1", "111", "1..", "1.."],
-    "Q": ["111", "1.1", "1.1", "111", "..1"],
-    "R": ["11.", "1.1", "11.", "1.1", "1.1"],
-    "S": ["111", "1..", "111", "..1", "111"],
-    "T": ["111", ".1.", ".1.", ".1.", ".1."],
-    "U": ["1.1", "1.1", "1.1", "1.1", "111"],
-    "V": ["1.1", "1.1", "1.1", "1.1", ".1."],
-    "W": ["1.1", "1.1", "111", "111", "1.1"],
-    "X": ["1.1", "1.1", ".1.", "1.1", "1.1"],
-    "Y": ["1.1", "1.1", ".1.", ".1.", ".1."],
-    "Z": ["111", "..1", ".1.", "1..", "111"],
-    "0": ["111", "1.1", "1.1", "1.1", "111"],
-    "1": [".1.", "11.", ".1.", ".1.", "111"],
-    "2": ["111", "..1", "111", "1..", "111"],
-    "3": ["111", "..1", "111", "..1", "111"],
-    "4": ["1.1", "1.1", "111", "..1", "..1"],
-    "5": ["111", "1..", "111", "..1", "111"],
-    "6": ["111", "1..", "111", "1.1", "111"],
-    "7": ["111", "..1", "..1", "..1", "..1"],
-    "8": ["111", "1.1", "111", "1.1", "111"],
-    "9": ["111", "1.1", "111", "..1", "111"],
-    " ": ["...", "...", "...", "...", "..."],
-    "-": ["...", "...", "111", "...", "..."],
-    ".": ["...", "...", "...", "...", ".1."],
-    ":": ["...", ".1.", "...", ".1.", "..."],
-    "!": [".1.", ".1.", ".1.", "...", ".1."],
-    "?": ["111", "..1", ".1.", "...", ".1."],
-    "'": [".1.", ".1.", "...", "...", "..."],
-}
+# Raster backend for per-pixel ops (dither, scatter, pixels, sprite at scale 1).
+# "numpy" renders exactly the same pixels as "pil", using array ops instead of putpixel.
+BACKEND = os.environ.get("FA_THUMB_BACKEND") or ("numpy" if np is not None else "pil")
+
+def _load_sprites(game_path):
+    """Sprites from _sprites.json in the game directory (reloaded when the file changes)."""
+    return sprite_store(game_path).data
 
-_sprites_cache = {}
-_sprites_cache_ts = {}
-_SPRITES_CACHE_TTL = 60  # 1 minute
 
+# Rasterized sprite frames — game path -> (_sprites.json stamp, {(category, name, frame, scale): entry}).
+# Entry is (image, coverage mask, per-color masks or None). The whole map for a
+# game is dropped when its _sprites.json changes.
+_sprite_atlas = {}
+_sprite_atlas_lock = threading.Lock()
 
-def _load_sprites(game_path):
-    """Load sprites from _sprites.json in the game directory."""
-    key = str(game_path)
-    now = time.time()
-    if key in _sprites_cache and (now - _sprites_cache_ts.get(key, 0)) < _SPRITES_CACHE_TTL:
-        return _sprites_cache[key]
-    sprites_path = game_path / "_sprites.json"
-    if not sprites_path.exists():
-        return {}
-    data = migrate_sprite_data(json.loads(sprites_path.read_text()))
-    _sprites_cache[key] = data
-    _sprites_cache_ts[key] = now
-    return data
+
+def _rasterize_sprite(pixel_rows, palette, scale):
+    color_map = {ch: _hex_to_rgba(c) for ch, c in palette.items() if ch != "."}
+    w = max((len(row) for row in pixel_rows), default=0)
+    h = len(pixel_rows)
+    image = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    mask = Image.new("L", (w, h), 0)
+    for dy, row in enumerate(pixel_rows):
+        for dx, ch in enumerate(row):
+            if ch in color_map:
+                image.putpixel((dx, dy), color_map[ch])
+                mask.putpixel((dx, dy), 255)
+    if scale > 1:
+        image = image.resize((w * scale, h * scale), Image.NEAREST)
+        mask = mask.resize((w * scale, h * scale), Image.NEAREST)
+    # Scaled pixels are blended by ImageDraw; translucent colors need one mask per color
+    color_masks = None
+    if scale > 1 and any(c[3] < 255 for c in color_map.values()):
+        color_masks = []
+        for ch, color in color_map.items():
+            m = Image.new("L", (w, h), 0)
+            for dy, row in enumerate(pixel_rows):
+                for dx, c in enumerate(row):
+                    if c == ch:
+                        m.putpixel((dx, dy), 255)
+            if m.getbbox():
+                color_masks.append((m.resize((w * scale, h * scale), Image.NEAREST), color))
+    return image, mask, color_masks
+
+
+def _sprite_raster(game_path, category, name, frame, scale):
+    """Cached raster of one sprite frame, or None if the sprite doesn't exist."""
+    store = sprite_store(game_path)
+    stamp = store.stamp
+    key = str(store.game_path)
+    with _sprite_atlas_lock:
+        entry = _sprite_atlas.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = _sprite_atlas[key] = (stamp, {})
+        atlas = entry[1]
+    sprite_def = store.data.get(category, {}).get(name)
+    if not sprite_def or not sprite_def.get("frames"):
+        return None
+    frames = sprite_def["frames"]
+    frame_key = (category, name, frame % len(frames), scale)
+    raster = atlas.get(frame_key)
+    if raster is None:
+        raster = atlas[frame_key] = _rasterize_sprite(frames[frame_key[2]], sprite_def.get("palette", {}), scale)
+    return sprite_def, raster
 
 RESAMPLE = {
     "nearest": Image.NEAREST,
@@ -97,31 +110,6 @@ def _hex_to_rgba(color):
     return (int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16), 255)
 
 
-def _put_scaled(canvas, draw, x, y, scale, color):
-    """Draw a single pixel or scaled rectangle."""
-    if scale <= 1:
-        if 0 <= x < canvas.width and 0 <= y < canvas.height:
-            canvas.putpixel((x, y), color)
-    else:
-        draw.rectangle([x, y, x + scale - 1, y + scale - 1], fill=color)
-
-
-def _draw_glyphs(canvas, draw, text, x0, y0, color, scale):
-    """Render text using the built-in 3x5 pixel font."""
-    char_w = 4 * scale
-    cx = x0
-    for ch in text:
-        glyph = PIXEL_FONT.get(ch, PIXEL_FONT.get(" "))
-        if not glyph:
-            cx += char_w
-            continue
-        for gy, row in enumerate(glyph):
-            for gx, pixel in enumerate(row):
-                if pixel == "1":
-                    _put_scaled(canvas, draw, cx + gx * scale, y0 + gy * scale, scale, color)
-        cx += char_w
-
-
 # --- Operation handlers ---
 
 def _op_fill(canvas, draw, op, _game_path, _warnings):
@@ -214,29 +202,24 @@ def _op_sprite(canvas, draw, op, game_path, warnings):
     if not game_path:
         warnings.append("sprite: no game_path — skipped")
         return
-    sprites = _load_sprites(game_path)
     category = s.get("category", "")
     name = s.get("name", "")
-    sprite_def = sprites.get(category, {}).get(name)
-    if not sprite_def:
+    if not _load_sprites(game_path).get(category, {}).get(name):
         warnings.append(f"sprite: '{category}/{name}' not found — skipped")
         return
-    x0, y0 = s.get("x", 0), s.get("y", 0)
-    scale = s.get("scale", 1)
-    frame = s.get("frame", 0)
-    palette = sprite_def.get("palette", {})
-    origin = sprite_def.get("origin", [0, 0])
-    frames = sprite_def.get("frames", [])
-    if not frames:
+    scale = max(1, int(s.get("scale", 1)))  # raster sizes need a positive int
+    found = _sprite_raster(game_path, category, name, s.get("frame", 0), scale)
+    if found is None:
         return
-    pixel_rows = frames[frame % len(frames)]
-    color_map = {ch: _hex_to_rgba(c) for ch, c in palette.items()}
-    ox, oy = origin[0] * scale, origin[1] * scale
-    for dy, row in enumerate(pixel_rows):
-        for dx, ch in enumerate(row):
-            if ch == "." or ch not in color_map:
-                continue
-            _put_scaled(canvas, draw, x0 - ox + dx * scale, y0 - oy + dy * scale, scale, color_map[ch])
+    sprite_def, (image, mask, color_masks) = found
+    origin = sprite_def.get("origin", [0, 0])
+    x = s.get("x", 0) - origin[0] * scale
+    y = s.get("y", 0) - origin[1] * scale
+    if color_masks is None:
+        canvas.paste(image, (x, y), mask)
+    else:
+        for m, color in color_masks:
+            draw.bitmap((x, y), m, fill=color)
 
 def _op_pixel_text(canvas, draw, op, _game_path, _warnings):
     t = op["pixel_text"]
@@ -244,10 +227,42 @@ def _op_pixel_text(canvas, draw, op, _game_path, _warnings):
     x0, y0 = t.get("x", 0), t.get("y", 0)
     color = _hex_to_rgba(t["color"]) if "color" in t else (255, 255, 255, 255)
     shadow = _hex_to_rgba(t["shadow"]) if "shadow" in t else None
-    scale = t.get("scale", 1)
+    scale = max(1, int(t.get("scale", 1)))
+    align = t.get("align", "left")
+    if align in ("center", "right"):
+        width = pixel_font.measure(text, scale)[0]
+        x0 -= width // 2 if align == "center" else width
     if shadow:
-        _draw_glyphs(canvas, draw, text, x0 + scale, y0 + scale, shadow, scale)
-    _draw_glyphs(canvas, draw, text, x0, y0, color, scale)
+        pixel_font.draw_text(canvas, draw, text, x0 + scale, y0 + scale, shadow, scale)
+    pixel_font.draw_text(canvas, draw, text, x0, y0, color, scale)
+
+@functools.lru_cache(maxsize=32)
+def _hex_corner_offsets(hex_size):
+    """Corner offsets of a pointy-top hex (same float math as the per-cell version)."""
+    return tuple(((hex_size - 1) * math.cos(math.radians(60 * i - 30)),
+                  (hex_size - 1) * math.sin(math.radians(60 * i - 30))) for i in range(6))
+
+
+def _hex_wide_outlines(index, cells, width):
+    """Set outline pixels (255) on `index` for outline widths > 1.
+
+    Pillow draws a wide polygon outline as a (2 * width - 1) line masked by the
+    polygon's own fill, allocating a full-image mask per polygon. Here the lines
+    are drawn per hex class (adjacent hexes never share one) and masked by that
+    class's fills once, which is the same set of pixels.
+    """
+    for hex_class in range(3):
+        members = [corners for corners, c in cells if c == hex_class]
+        if not members:
+            continue
+        lines = Image.new("L", index.size, 0)
+        fills = Image.new("L", index.size, 0)
+        lines_draw, fills_draw = ImageDraw.Draw(lines), ImageDraw.Draw(fills)
+        for corners in members:
+            fills_draw.polygon(corners, fill=255)
+            lines_draw.line(corners + corners[:1], fill=255, width=width * 2 - 1)
+        index.paste(255, (0, 0) + index.size, ImageChops.multiply(lines, fills))
+
 
 def _op_hex_grid(canvas, draw, op, game_path, warnings):
     g = op["hex_grid"]
@@ -262,22 +277,148 @@ def _op_hex_grid(canvas, draw, op, game_path, warnings):
     default_color = _hex_to_rgba(g.get("default_color", "#5a8c3c"))
     hex_w = hex_size * math.sqrt(3)
     hex_h = hex_size * 2
+    offsets = _hex_corner_offsets(hex_size)
+    legend = {name: _hex_to_rgba(c) for name, c in colors.items()}
+
+    # Masks cover only the grid's bounds on the canvas
+    margin = outline_width + 1
+    bx0 = max(0, math.floor(x0) - margin)
+    by0 = max(0, math.floor(y0) - margin)
+    bx1 = min(canvas.width, math.ceil(x0 + (cols + 1) * hex_w) + margin)
+    by1 = min(canvas.height, math.ceil(y0 + (rows * 0.75 + 0.25) * hex_h) + margin)
+
+    # Cells grouped by fill. Hexes never overlap, so painting each fill's cells
+    # into a color-index image and pasting once gives the same pixels as
+    # drawing cell by cell. Corners are shifted into mask space by whole pixels.
+    # Corner coordinates depend only on (column, row parity) for x and on row for y
+    corner_xs = [[tuple(x0 + c * hex_w + (hex_w / 2 if parity else 0) + hex_w / 2 + dx - bx0 for dx, _ in offsets)
+                  for c in range(cols)] for parity in (0, 1)]
+    cells = {}  # fill -> [(corners, class), ...] in first-seen order
+    unknown = {}  # terrain name -> cell count
     for r in range(rows):
+        row_terrain = terrain[r] if r < len(terrain) else ()
+        cy = y0 + r * hex_h * 0.75 + hex_h / 2
+        ys = tuple(cy + dy - by0 for _, dy in offsets)
+        xs_row = corner_xs[r % 2]
         for c in range(cols):
-            cx = x0 + c * hex_w + (hex_w / 2 if r % 2 == 1 else 0) + hex_w / 2
-            cy = y0 + r * hex_h * 0.75 + hex_h / 2
             fill = default_color
-            if r < len(terrain) and c < len(terrain[r]):
-                t_name = terrain[r][c]
-                if t_name in colors:
-                    fill = _hex_to_rgba(colors[t_name])
-                else:
-                    warnings.append(f"hex_grid: terrain '{t_name}' not in colors — using default")
-            corners = []
-            for i in range(6):
-                angle = math.radians(60 * i - 30)
-                corners.append((cx + (hex_size - 1) * math.cos(angle), cy + (hex_size - 1) * math.sin(angle)))
-            draw.polygon(corners, fill=fill, outline=outline_color, width=outline_width)
+            if c < len(row_terrain):
+                t_name = row_terrain[c]
+                fill = legend.get(t_name)
+                if fill is None:
+                    fill = default_color
+                    unknown[t_name] = unknown.get(t_name, 0) + 1
+            hex_class = (c - (r - (r & 1)) // 2 + 2 * r) % 3  # neighbors never share a class
+            cells.setdefault(fill, []).append((list(zip(xs_row[c], ys)), hex_class))
+    for t_name, count in unknown.items():
+        suffix = f" ({count} cells)" if count > 1 else ""
+        warnings.append(f"hex_grid: terrain '{t_name}' not in colors — using default{suffix}")
+
+    if bx1 <= bx0 or by1 <= by0:
+        return
+    size = (bx1 - bx0, by1 - by0)
+    # Pillow skips an outline that matches the fill
+    outlined = {fill for fill in cells if outline_color and outline_color != fill}
+    wide = bool(outlined) and outline_width > 1
+    if wide and outline_width > hex_size:
+        wide = False  # a wide outline could reach the next hex — draw cell by cell
+    fills = list(cells)
+    per_chunk = 254 if outlined else 255  # index 0 = empty, 255 = outline
+    for start in range(0, len(fills), per_chunk):
+        chunk = fills[start:start + per_chunk]
+        index = Image.new("L", size, 0)
+        index_draw = ImageDraw.Draw(index)
+        for i, fill in enumerate(chunk, 1):
+            outline = 255 if fill in outlined and not wide else None
+            for corners, _ in cells[fill]:
+                index_draw.polygon(corners, fill=i, outline=outline, width=outline_width)
+        if wide:
+            _hex_wide_outlines(index, [cell for fill in chunk if fill in outlined for cell in cells[fill]], outline_width)
+        palette = chunk + [(0, 0, 0, 0)] * (255 - len(chunk))
+        if outlined:
+            palette[254] = outline_color
+        luts = [[0] + [color[ch] for color in palette] for ch in range(4)]
+        colored = Image.merge("RGBA", [index.point(lut) for lut in luts])
+        canvas.paste(colored, (bx0, by0), index.point([0] + [255] * 255))
+
+
+# --- NumPy backend (same pixels as the putpixel ops above) ---
+
+def _clip_box(canvas, x0, y0, w, h):
+    """Intersection of a rect with the canvas as a PIL box, or None if empty."""
+    bx0, by0 = max(x0, 0), max(y0, 0)
+    bx1, by1 = min(x0 + w, canvas.width), min(y0 + h, canvas.height)
+    if bx1 <= bx0 or by1 <= by0:
+        return None
+    return (bx0, by0, bx1, by1)
+
+
+def _mt_from_random(rng):
+    """NumPy MT19937 with the exact state of a random.Random — random_sample()
+    then yields the same doubles as rng.random()."""
+    state = rng.getstate()[1]
+    mt = np.random.RandomState()
+    mt.set_state(("MT19937", np.array(state[:624], dtype=np.uint32), state[624]))
+    return mt
+
+
+def _np_blit_rows(canvas, rows, color_map, x0, y0):
+    """Write palette chars of rows at (x0, y0) — putpixel semantics (replace, no blend)."""
+    h = len(rows)
+    w = max((len(r) for r in rows), default=0)
+    box = _clip_box(canvas, x0, y0, w, h)
+    if box is None:
+        return
+    codes = np.zeros((h, w), dtype=np.uint32)
+    for dy, row in enumerate(rows):
+        if row:
+            codes[dy, :len(row)] = np.frombuffer(row.encode("utf-32-le"), dtype=np.uint32)
+    codes = codes[box[1] - y0:box[3] - y0, box[0] - x0:box[2] - x0]
+    arr = np.array(canvas.crop(box))
+    for ch, color in color_map.items():
+        if len(ch) == 1:
+            arr[codes == ord(ch)] = color
+    canvas.paste(Image.fromarray(arr), box)
+
+
+def _np_op_scatter(canvas, draw, op, _game_path, _warnings):
+    s = op["scatter"]
+    color = _hex_to_rgba(s["color"])
+    count = s.get("count", 20)
+    x0, y0 = s.get("x", 0), s.get("y", 0)
+    sw = s.get("w", canvas.width)
+    sh = s.get("h", canvas.height)
+    rng = random.Random(s.get("seed", 42))
+    pts = np.array([(x0 + rng.randint(0, sw - 1), y0 + rng.randint(0, sh - 1)) for _ in range(count)], dtype=np.int64).reshape(-1, 2)
+    pts = pts[(pts[:, 0] >= 0) & (pts[:, 0] < canvas.width) & (pts[:, 1] >= 0) & (pts[:, 1] < canvas.height)]
+    if not len(pts):
+        return
+    arr = np.array(canvas)
+    arr[pts[:, 1], pts[:, 0]] = color
+    canvas.paste(Image.fromarray(arr))
+
+
+def _np_op_dither(canvas, draw, op, _game_path, _warnings):
+    d = op["dither"]
+    color = _hex_to_rgba(d["color"])
+    x0, y0 = d.get("x", 0), d.get("y", 0)
+    dw, dh = d.get("w", canvas.width), d.get("h", canvas.height)
+    density = d.get("density", 0.3)
+    box = _clip_box(canvas, x0, y0, dw, dh)
+    if box is None:
+        return
+    # One draw per pixel of the full (unclipped) region, row-major — as the PIL path
+    mask = _mt_from_random(random.Random(d.get("seed", 42))).random_sample(dw * dh).reshape(dh, dw) < density
+    mask = mask[box[1] - y0:box[3] - y0, box[0] - x0:box[2] - x0]
+    arr = np.array(canvas.crop(box))
+    arr[mask] = color
+    canvas.paste(Image.fromarray(arr), box)
+
+
+def _np_op_pixels(canvas, draw, op, _game_path, _warnings):
+    p = op["pixels"]
+    color_map = {ch: _hex_to_rgba(c) for ch, c in p.get("palette", {}).items()}
+    _np_blit_rows(canvas, p.get("rows", []), color_map, p.get("x", 0), p.get("y", 0))
 
 
 # Dispatch table — maps operation key to handler
@@ -298,74 +439,371 @@ _OP_DISPATCH = {
 }
 
 
-def _draw_op(canvas, op, game_path=None, warnings=None):
-    draw = ImageDraw.Draw(canvas, "RGBA")
-    for key, handler in _OP_DISPATCH.items():
-        if key in op:
-            handler(canvas, draw, op, game_path, warnings)
-            return
-    if warnings is not None:
-        warnings.append(f"Unknown operation: {list(op.keys())}")
+_NUMPY_OPS = {
+    "scatter": _np_op_scatter,
+    "dither": _np_op_dither,
+    "pixels": _np_op_pixels,
+}
 
 
-def create_thumbnail(args):
-    game_path = validate_game_path(args["path"])
-    layers = args.get("layers", [])
-    out_w = min(args.get("w", DEFAULT_THUMB_W), 1024)
-    out_h = min(args.get("h", DEFAULT_THUMB_H), 1024)
+_OP_ORDER = {key: i for i, key in enumerate(_OP_DISPATCH)}
+_TABLES = {"pil": _OP_DISPATCH, "numpy": {**_OP_DISPATCH, **_NUMPY_OPS}}
 
-    if not layers:
-        return json.dumps({"error": "layers is required — list of layers [{res, aa, ops}, ...]"})
+# Layers of one thumbnail are rasterized in parallel (Pillow releases the GIL
+# in draw primitives and resize). FA_THUMB_WORKERS overrides the pool size.
+LAYER_WORKERS = max(1, int(os.environ.get("FA_THUMB_WORKERS") or min(4, os.cpu_count() or 1)))
+_layer_pool = ThreadPoolExecutor(max_workers=LAYER_WORKERS, thread_name_prefix="fa-thumb-layer")
 
-    warnings = []
-    final = Image.new("RGBA", (out_w, out_h), (0, 0, 0, 0))
+# FA_THUMB_TIMING=1 adds per-op render timings to the create_thumbnail result
+DEBUG_TIMING = os.environ.get("FA_THUMB_TIMING", "") not in ("", "0")
 
-    for layer in layers:
-        res = layer.get("res", [out_w, out_h])
-        aa = layer.get("aa", "bilinear")
-        opacity = layer.get("opacity", 1.0)
-        ops = layer.get("ops", [])
-        resample = RESAMPLE.get(aa, Image.BILINEAR)
 
-        lw, lh = res[0], res[1]
-        canvas = Image.new("RGBA", (lw, lh), (0, 0, 0, 0))
+def _dispatch_table(backend=None):
+    backend = backend or BACKEND
+    return _TABLES["numpy" if backend == "numpy" and np is not None else "pil"]
 
-        for op in ops:
-            _draw_op(canvas, op, game_path=game_path, warnings=warnings)
 
-        if (lw, lh) != (out_w, out_h):
-            canvas = canvas.resize((out_w, out_h), resample)
+class _OpRecord:
+    """A parsed op: handler resolved once at compile time."""
+    __slots__ = ("index", "key", "handler", "op")
 
-        if opacity < 1.0:
-            alpha = canvas.split()[3]
-            alpha = alpha.point(lambda a, o=opacity: int(a * o))
-            canvas.putalpha(alpha)
+    def __init__(self, index, key, handler, op):
+        self.index = index
+        self.key = key
+        self.handler = handler
+        self.op = op
 
-        final = Image.alpha_composite(final, canvas)
 
-    out = final.convert("RGB")
-    out_path = game_path / "_thumbnail.png"
-    out.save(out_path)
+def _compile_ops(ops, warnings=None, backend=None):
+    """Parse a layer's ops into _OpRecords. Invalid/unknown ops are reported once and dropped.
 
-    def_path = game_path / "_thumbnail.json"
-    thumbnail_def = {"layers": args.get("layers", []), "w": out_w, "h": out_h}
-    def_path.write_text(json.dumps(thumbnail_def, indent=2))
+    An op with several known keys uses the first one in _OP_DISPATCH order.
+    """
+    table = _dispatch_table(backend)
+    records = []
+    for i, op in enumerate(ops):
+        if not isinstance(op, dict):
+            if warnings is not None:
+                warnings.append(f"Invalid operation at index {i}: expected object")
+            continue
+        keys = [k for k in op if k in table]
+        if not keys:
+            if warnings is not None:
+                warnings.append(f"Unknown operation: {list(op.keys())}")
+            continue
+        key = keys[0] if len(keys) == 1 else min(keys, key=_OP_ORDER.get)
+        records.append(_OpRecord(i, key, table[key], op))
+    return records
+
+
+def _render_ops(canvas, records, game_path=None, warnings=None, timings=None):
+    """Run compiled ops on canvas with one shared draw context.
+
+    timings: optional list — receives {"op", "index", "ms"} per op.
+    """
+    draw = ImageDraw.Draw(canvas, "RGBA")
+    if timings is None:
+        for rec in records:
+            rec.handler(canvas, draw, rec.op, game_path, warnings)
+        return
+    for rec in records:
+        t0 = time.perf_counter()
+        rec.handler(canvas, draw, rec.op, game_path, warnings)
+        timings.append({"op": rec.key, "index": rec.index, "ms": round((time.perf_counter() - t0) * 1000, 3)})
+
+
+# --- Layer render cache ---
+# Rendered, resized, opacity-applied layer images keyed by a hash of the layer
+# spec, the sprite data it references and the output size. Memory LRU in front
+# of an on-disk LRU shared by all MCP servers.
+_RENDER_CACHE_VERSION = 2  # bump when rendering changes
+_RENDER_CACHE_DIR = Path(os.environ.get("FA_CACHE_DIR") or PLATFORM_ROOT / ".cache") / "thumbnails"
+_RENDER_CACHE_MEM = 64  # layers kept in memory
+_RENDER_CACHE_DISK = 512  # layers kept on disk
+_render_cache = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+
+def _layer_key(layer, game_path, out_w, out_h):
+    sprite_refs = {}
+    for op in layer.get("ops", []):
+        if isinstance(op, dict) and isinstance(op.get("sprite"), dict):
+            cat, name = op["sprite"].get("category", ""), op["sprite"].get("name", "")
+            sprite_refs[f"{cat}/{name}"] = _load_sprites(game_path).get(cat, {}).get(name) if game_path else None
+    spec = {"v": _RENDER_CACHE_VERSION, "layer": layer, "sprites": sprite_refs, "size": [out_w, out_h]}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _render_cache_get(key):
+    with _render_cache_lock:
+        if key in _render_cache:
+            _render_cache.move_to_end(key)
+            return _render_cache[key]
+    png_path = _RENDER_CACHE_DIR / f"{key}.png"
+    try:
+        warnings = json.loads((_RENDER_CACHE_DIR / f"{key}.json").read_text())
+        with Image.open(png_path) as img:
+            image = img.convert("RGBA")
+        os.utime(png_path)  # LRU by mtime
+    except (OSError, ValueError):
+        return None
+    _render_cache_put(key, image, warnings, disk=False)
+    return image, warnings
+
+
+def _render_cache_put(key, image, warnings, disk=True):
+    with _render_cache_lock:
+        _render_cache[key] = (image, warnings)
+        _render_cache.move_to_end(key)
+        while len(_render_cache) > _RENDER_CACHE_MEM:
+            _render_cache.popitem(last=False)
+    if not disk:
+        return
+    try:
+        _RENDER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = _RENDER_CACHE_DIR / f".{key}.{os.getpid()}.tmp"
+        image.save(tmp, format="PNG")
+        (_RENDER_CACHE_DIR / f"{key}.json").write_text(json.dumps(warnings))
+        os.replace(tmp, _RENDER_CACHE_DIR / f"{key}.png")
+        entries = sorted(_RENDER_CACHE_DIR.glob("*.png"), key=lambda p: p.stat().st_mtime)
+        for old in entries[:max(0, len(entries) - _RENDER_CACHE_DISK)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".json").unlink(missing_ok=True)
+    except OSError as e:
+        print(f"Warning: thumbnail cache write failed: {e}", file=sys.stderr)
+
+
+def _rasterize_layer(layer, res, game_path, timing=False):
+    """Draw a layer's ops on a transparent canvas at `res`. Returns (canvas, warnings, op timings)."""
+    warnings = []
+    canvas = Image.new("RGBA", (res[0], res[1]), (0, 0, 0, 0))
+    op_timings = [] if timing else None
+    _render_ops(canvas, _compile_ops(layer.get("ops", []), warnings), game_path, warnings, op_timings)
+    return canvas, warnings, op_timings
+
+
+def _render_layer(layer, out_w, out_h, game_path, timing=False, rasters=None):
+    """Render one layer at its res, resize to the output size and apply opacity.
+
+    Returns (RGBA image, warnings, timing entry or None). Served from the render
+    cache when the same layer spec (and referenced sprites) was rendered before
+    at this size. Layers are independent, so this runs on the layer pool.
+    `rasters` ({res: raster}) shares the native-res raster between output sizes.
+    """
+    key = _layer_key(layer, game_path, out_w, out_h)
+    cached = _render_cache_get(key)
+    if cached is not None:
+        return cached + ({"cached": True} if timing else None,)
+
+    res = tuple(layer.get("res", [out_w, out_h]))
+    aa = layer.get("aa", "bilinear")
+    opacity = layer.get("opacity", 1.0)
+    resample = RESAMPLE.get(aa, Image.BILINEAR)
+
+    raster = rasters.get(res) if rasters is not None else None
+    shared = raster is not None
+    if raster is None:
+        raster = _rasterize_layer(layer, res, game_path, timing)
+        if rasters is not None:
+            rasters[res] = raster
+    canvas, warnings, op_timings = raster
+
+    if res != (out_w, out_h):
+        canvas = canvas.resize((out_w, out_h), resample)
+    elif opacity < 1.0 and rasters is not None:
+        canvas = canvas.copy()  # the raster is shared with other outputs
+
+    if opacity < 1.0:
+        canvas.putalpha(canvas.getchannel("A").point(_opacity_lut(opacity)))
+
+    _render_cache_put(key, canvas, warnings)
+    if not timing:
+        return canvas, warnings, None
+    return canvas, warnings, {"res": list(res), "shared": True} if shared else {"res": list(res), "ops": op_timings}
+
+
+@functools.lru_cache(maxsize=64)
+def _opacity_lut(opacity):
+    """256-entry alpha table for a layer opacity (same rounding as int(a * o))."""
+    return [int(a * opacity) for a in range(256)]
+
+
+def _flatten(final, layer):
+    """Composite `layer` over `final` in place, touching only its bounding box."""
+    bbox = layer.getbbox()  # alpha-only for RGBA
+    if bbox is None:
+        return  # fully transparent
+    region = layer if bbox == (0, 0) + layer.size else layer.crop(bbox)
+    if region.getchannel("A").getextrema()[0] == 255:
+        final.paste(region, bbox[:2])  # opaque over its bbox — replaces what's below
+    else:
+        final.alpha_composite(region, dest=bbox[:2])
+
+
+# Extra output formats — format -> (file suffix, PIL save kwargs)
+OUTPUT_FORMATS = {
+    "png": (".png", {"format": "PNG"}),
+    "webp": (".webp", {"format": "WEBP", "lossless": True, "method": 6}),
+    "png8": ("-8bit.png", {"format": "PNG", "optimize": True}),
+}
+MAX_OUTPUTS = 8
+
+
+def _parse_outputs(outputs):
+    """Validate the `outputs` list. Returns ([{file, w, h, format}], error)."""
+    if not isinstance(outputs, list) or len(outputs) > MAX_OUTPUTS:
+        return None, f"outputs must be a list of at most {MAX_OUTPUTS} {{w, h, format}} objects"
+    parsed = []
+    for i, o in enumerate(outputs):
+        if not isinstance(o, dict):
+            return None, f"outputs[{i}] must be an object {{w, h, format}}"
+        w, h, fmt = o.get("w"), o.get("h"), o.get("format", "png")
+        if not isinstance(w, int) or not isinstance(h, int) or not (1 <= w <= 1024 and 1 <= h <= 1024):
+            return None, f"outputs[{i}]: w and h must be integers 1-1024"
+        if fmt not in OUTPUT_FORMATS:
+            return None, f"outputs[{i}]: unknown format '{fmt}' (use {', '.join(OUTPUT_FORMATS)})"
+        file = f"_thumbnail-{w}x{h}{OUTPUT_FORMATS[fmt][0]}"
+        if any(p["file"] == file for p in parsed):
+            return None, f"outputs[{i}]: duplicate {w}x{h} {fmt}"
+        parsed.append({"file": file, "w": w, "h": h, "format": fmt})
+    return parsed, None
+
+
+def _encode(image, fmt):
+    suffix, save_args = OUTPUT_FORMATS[fmt]
+    image = image.convert("RGB")
+    if fmt == "png8":
+        image = image.quantize(colors=256)  # exact when the image has <= 256 colors
+    buf = io.BytesIO()
+    image.save(buf, **save_args)
+    return buf.getvalue()
+
+
+def _preview_png(image, min_width=288):
+    """The thumbnail upscaled (nearest) for display in the tool result."""
+    factor = max(1, -(-min_width // image.width))
+    if factor > 1:
+        image = image.resize((image.width * factor, image.height * factor), Image.NEAREST)
+    buf = io.BytesIO()
+    image.convert("RGB").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _git_dirty(game_path, names):
+    """True if any of `names` differs from HEAD (modified, deleted or untracked)."""
+    try:
+        r = subprocess.run(["git", "status", "--porcelain", "--", *names], cwd=game_path, capture_output=True, timeout=10)
+        return r.returncode != 0 or bool(r.stdout.strip())
+    except Exception:
+        return True
 
-    pushed = False
+
+def _config_changed_besides(game_path, config, key):
+    """True if `config` differs from the committed .forkarcade.json in anything but `key`."""
     try:
-        subprocess.run(["git", "add", "_thumbnail.png", "_thumbnail.json"], cwd=game_path, capture_output=True, timeout=10)
-        subprocess.run(["git", "commit", "-m", "Update thumbnail"], cwd=game_path, capture_output=True, timeout=10)
-        r = subprocess.run(["git", "push"], cwd=game_path, capture_output=True, timeout=30)
-        pushed = r.returncode == 0
-    except Exception as e:
-        print(f"Warning: thumbnail git push failed: {e}", file=sys.stderr)
-
-    git_msg = "Pushed to GitHub." if pushed else "Git push failed or skipped."
+        r = subprocess.run(["git", "show", "HEAD:./.forkarcade.json"], cwd=game_path, capture_output=True, timeout=10)
+        head = json.loads(r.stdout) if r.returncode == 0 else None
+    except Exception:
+        head = None
+    if not isinstance(head, dict):
+        return True
+    head.pop(key, None)
+    return head != {k: v for k, v in config.items() if k != key}
+
+
+def create_thumbnail(args):
+    game_path = validate_game_path(args["path"])
+    layers = args.get("layers", [])
+    out_w = min(args.get("w", DEFAULT_THUMB_W), 1024)
+    out_h = min(args.get("h", DEFAULT_THUMB_H), 1024)
+
+    if not layers:
+        return json.dumps({"error": "layers is required — list of layers [{res, aa, ops}, ...]"})
+
+    extra, error = _parse_outputs(args.get("outputs", []))
+    if error:
+        return json.dumps({"error": error})
+    outputs = [{"file": "_thumbnail.png", "w": out_w, "h": out_h, "format": "png"}]
+    outputs += extra
+
+    warnings = []
+    timings = [] if DEBUG_TIMING else None
+    finals = [Image.new("RGBA", (o["w"], o["h"]), (0, 0, 0, 0)) for o in outputs]
+
+    def render(layer):
+        rasters = {}
+        return [_render_layer(layer, o["w"], o["h"], game_path, timings is not None, rasters) for o in outputs]
+
+    # Layers render concurrently; results come back (and composite) in spec order
+    rendered = _layer_pool.map(render, layers) if len(layers) > 1 else map(render, layers)
+    for i, per_output in enumerate(rendered):
+        for final, output, (canvas, layer_warnings, timing) in zip(finals, outputs, per_output):
+            if output is outputs[0]:
+                warnings.extend(layer_warnings)  # same ops at every size — report once
+            if timings is not None:
+                timings.append({"layer": i, **({"output": output["file"]} if extra else {}), **timing})
+            _flatten(final, canvas)
+
+    files = {o["file"]: _encode(final, o["format"]) for o, final in zip(outputs, finals)}
+    thumbnail_def = {"layers": args.get("layers", []), "w": out_w, "h": out_h}
+    if extra:
+        thumbnail_def["outputs"] = [{k: o[k] for k in ("w", "h", "format")} for o in extra]
+    files["_thumbnail.json"] = json.dumps(thumbnail_def, indent=2).encode()
+
+    for name, data in files.items():
+        path = game_path / name
+        if not path.exists() or path.read_bytes() != data:
+            tmp = path.with_name(f".{name}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)  # the push queue may be staging the previous version
+    names = list(files)
+
+    # Record generated files in .forkarcade.json so the platform can pick a size
+    ctx = game_context(game_path)
+    recorded = ctx.get("thumbnails")
+    if extra or recorded is not None:
+        entries = [{k: o[k] for k in ("file", "w", "h", "format")} for o in outputs]
+        if not ctx.valid:
+            warnings.append(".forkarcade.json missing or invalid — thumbnail files not recorded")
+        else:
+            config = ctx.editable()
+            if recorded != entries:
+                for old in recorded or []:
+                    stale = old.get("file", "") if isinstance(old, dict) else ""
+                    if stale.startswith("_thumbnail-") and "/" not in stale and stale not in files:
+                        (game_path / stale).unlink(missing_ok=True)
+                        names.append(stale)  # the push queue skips it if git never tracked it
+                config["thumbnails"] = entries
+                ctx.save(config)
+            if _config_changed_besides(game_path, config, "thumbnails"):
+                warnings.append(".forkarcade.json has other uncommitted changes — thumbnail list saved but not committed")
+            else:
+                names.append(".forkarcade.json")
+
+    # Commit + push happen in the background; repeated updates coalesce into one push
+    if _git_dirty(game_path, names):
+        push = push_queue.enqueue(game_path, names, "Update thumbnail")
+        if args.get("wait"):
+            push = push_queue.flush(game_path)
+        git_msg = {
+            "pushed": "Pushed to GitHub.",
+            "committed": "Committed (remote already up to date).",
+            "failed": "Git push failed — see push.last.error.",
+        }.get(push["state"], "Commit + push queued (get_push_status for progress).")
+    else:
+        push = push_queue.status(game_path)
+        git_msg = "Unchanged since last commit — git skipped."
+    sizes = ", ".join(f"{o['w']}x{o['h']} {o['format']}" for o in outputs) if extra else f"{out_w}x{out_h}"
     result = {
         "ok": True,
-        "message": f"Thumbnail saved ({out_w}x{out_h}, {len(layers)} layers). {git_msg}",
-        "path": str(out_path),
+        "message": f"Thumbnail saved ({sizes}, {len(layers)} layers). {git_msg}",
+        "path": str(game_path / "_thumbnail.png"),
+        "push": push,
     }
+    if extra:
+        result["files"] = [o["file"] for o in outputs]
     if warnings:
         result["warnings"] = warnings
-    return json.dumps(result)
+    if timings:
+        result["timings"] = timings
+    return json.dumps(result), [("image/png", _preview_png(finals[0]))]
@@ -1,22 +1,39 @@
 import json
-from context import validate_game_path
+import snapshots
+from context import validate_game_path, game_context
 
 
 def get_versions(args):
     game_path = validate_game_path(args["path"])
-    config_path = game_path / ".forkarcade.json"
+    ctx = game_context(game_path)
 
-    if not config_path.exists():
+    if not ctx.exists:
         return json.dumps({"error": "No .forkarcade.json found"})
 
-    try:
-        config = json.loads(config_path.read_text())
-        return json.dumps({
-            "slug": config.get("slug"),
-            "title": config.get("title"),
-            "template": config.get("template"),
-            "currentVersion": config.get("currentVersion", 0),
-            "versions": config.get("versions", []),
-        }, indent=2)
-    except Exception:
+    config = ctx.config
+    if not ctx.valid:
         return json.dumps({"error": "Cannot parse .forkarcade.json"})
+
+    # Snapshot contents and diffs come from manifests — no file contents are read
+    if "diff" in args:
+        versions = args["diff"]
+        if not isinstance(versions, list) or len(versions) != 2:
+            return json.dumps({"error": "diff must be [from_version, to_version]"})
+        manifests = [snapshots.read_manifest(game_path, v) for v in versions]
+        missing = [v for v, m in zip(versions, manifests) if m is None]
+        if missing:
+            return json.dumps({"error": f"No snapshot for version(s): {missing}"})
+        return json.dumps(snapshots.diff_manifests(*manifests), indent=2)
+    if "version" in args:
+        manifest = snapshots.read_manifest(game_path, args["version"])
+        if manifest is None:
+            return json.dumps({"error": f"No snapshot for version {args['version']}"})
+        return json.dumps(manifest, indent=2)
+
+    return json.dumps({
+        "slug": config.get("slug"),
+        "title": config.get("title"),
+        "template": config.get("template"),
+        "currentVersion": config.get("currentVersion", 0),
+        "versions": config.get("versions", []),
+    }, indent=2)
@@ -1,18 +1,26 @@
+import hashlib
 import json
 import os
 import re
 import shutil
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
 from urllib.request import Request, urlopen
 from urllib.error import URLError
 
-from github_templates import ORG, _gh_api, list_templates as gh_list_templates, get_template, get_template_prompt, get_template_styles
-from sprites import generate_sprites_js
+import bundler
+import github_client
+import push_queue
+import snapshots
+from github_templates import ORG, _gh_api, cache_stats, list_templates as gh_list_templates, get_template, get_template_prompt, get_template_styles
+from sprites import sprite_store
 from maps import generate_maps_js
-from context import validate_game_path, PLATFORM_ROOT, GAMES_DIR
+from context import validate_game_path, game_context, PLATFORM_ROOT, GAMES_DIR
+from executor import Cancelled, check_cancelled
 
 SDK_DIR = PLATFORM_ROOT / "sdk"
 # Base files for version snapshots — includes generated sprite/map JS
@@ -21,17 +29,12 @@ BASE_FILES = ["index.html", "style.css", "sprites.js", "maps.js", "forkarcade-sd
 # Engine CDN — canonical engine files served via jsDelivr
 ENGINE_CDN_BASE = "https://cdn.jsdelivr.net/gh/ForkArcade/forkarcade-engine"
 LATEST_ENGINE_VERSION = 2
+CACHE_BUST_LEN = 10  # hex chars of the content hash in ?v=
 
 
 def _get_config(game_path):
-    """Read .forkarcade.json from game directory."""
-    config_path = game_path / ".forkarcade.json"
-    if config_path.exists():
-        try:
-            return json.loads(config_path.read_text())
-        except Exception as e:
-            print(f"Warning: failed to parse {config_path}: {e}", file=sys.stderr)
-    return {}
+    """Read .forkarcade.json from game directory (cached by mtime/size)."""
+    return game_context(game_path).config
 
 
 def _get_engine_files(game_path):
@@ -51,12 +54,37 @@ def _get_snapshot_files(game_path):
 
 def run(cmd_args, cwd=None):
     """Run a command. cmd_args must be a list (no shell=True)."""
+    check_cancelled()
     result = subprocess.run(cmd_args, shell=False, capture_output=True, text=True, timeout=30, cwd=cwd)
     if result.returncode != 0:
         raise RuntimeError(result.stderr.strip() or f"Command failed: {cmd_args}")
     return result.stdout.strip()
 
 
+def _clone_url(repo):
+    """The URL `gh repo create --clone` would clone: ssh_url when gh's git_protocol is ssh."""
+    try:
+        r = subprocess.run(["gh", "config", "get", "git_protocol", "-h", "github.com"],
+                           capture_output=True, text=True, timeout=10)
+        protocol = r.stdout.strip() if r.returncode == 0 else ""
+    except (OSError, subprocess.TimeoutExpired):
+        protocol = ""  # no gh — HTTPS, with whatever credential helper git has
+    if protocol == "ssh" and repo.get("ssh_url"):
+        return repo["ssh_url"]
+    return repo["clone_url"]
+
+
+def _clone_new_repo(clone_url, slug, attempts=5):
+    """Clone a repo generated from a template. Generation is async on GitHub's
+    side, so the first clone attempts can fail with 'repository not found'."""
+    for attempt in range(attempts):
+        try:
+            return run(["git", "clone", clone_url, slug], cwd=GAMES_DIR)
+        except RuntimeError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(1 + attempt)
+
 
 def _get_sdk_info():
     """Read canonical SDK file and extract version."""
@@ -75,6 +103,10 @@ def list_templates(args):
     return json.dumps(items, indent=2)
 
 
+def get_cache_stats(args):
+    return json.dumps(cache_stats(), indent=2)
+
+
 def _apply_style(game_path, template_key, style_key=None):
     """Apply a style preset to the game. Returns style info dict or None."""
     styles_data = get_template_styles(template_key)
@@ -145,12 +177,13 @@ def init_game(args):
 
     try:
         GAMES_DIR.mkdir(parents=True, exist_ok=True)
-        run(["gh", "repo", "create", f"{ORG}/{slug}", "--template", tmpl['repo'], "--public", "--clone"], cwd=GAMES_DIR)
-
-        if description:
-            run(["gh", "repo", "edit", f"{ORG}/{slug}", "--description", description])
+        gh = github_client.client()
+        repo = gh.post(f"/repos/{tmpl['repo']}/generate", {
+            "owner": ORG, "name": slug, "description": description, "private": False,
+        })
+        _clone_new_repo(_clone_url(repo), slug)
 
-        run(["gh", "repo", "edit", f"{ORG}/{slug}", "--add-topic", "forkarcade-game", "--add-topic", template])
+        gh.add_topics(f"{ORG}/{slug}", ["forkarcade-game", template])
 
         game_path = GAMES_DIR / slug
         sdk_info = _get_sdk_info()
@@ -164,19 +197,14 @@ def init_game(args):
         # Apply style preset (if template has styles)
         style_info = _apply_style(game_path, template, style_key)
 
-        config_path = game_path / ".forkarcade.json"
-        game_config = {}
-        if config_path.exists():
-            try:
-                game_config = json.loads(config_path.read_text())
-            except Exception:
-                pass
+        ctx = game_context(game_path)
+        game_config = ctx.editable()
         game_config.update({"slug": slug, "title": title, "currentVersion": 0, "versions": [], "sdkVersion": sdk_info["version"]})
         if style_info:
             game_config["style"] = style_info["style"]
             game_config["fontFamily"] = style_info["fontFamily"]
         game_config.setdefault("template", template)
-        config_path.write_text(json.dumps(game_config, indent=2) + "\n")
+        ctx.save(game_config)
 
         mcp_config = {
             "mcpServers": {
@@ -190,8 +218,7 @@ def init_game(args):
         }
         (game_path / ".mcp.json").write_text(json.dumps(mcp_config, indent=2) + "\n")
 
-        (game_path / "_sprites.json").write_text("{}\n")
-        (game_path / "sprites.js").write_text(generate_sprites_js({}))
+        sprite_store(game_path).replace({})
         (game_path / "_maps.json").write_text("{}\n")
         (game_path / "maps.js").write_text(generate_maps_js({}))
 
@@ -391,108 +418,240 @@ def validate_game(args):
     return json.dumps({"valid": len(issues) == 0, "issues": issues, "warnings": warnings, "path": str(game_path)}, indent=2)
 
 
-def publish_game(args):
-    game_path = validate_game_path(args["path"])
-    slug = args["slug"]
-    title = args["title"]
-    description = args.get("description", "")
-    results = []
+def _timed(timings, stage, fn, *args):
+    """Call fn(*args), recording its wall time in ms under timings[stage]."""
+    t0 = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        timings[stage] = round((time.perf_counter() - t0) * 1000, 1)
 
-    if not re.match(r"^[a-z0-9-]+$", slug):
-        return json.dumps({"error": "Slug must be lowercase alphanumeric with hyphens"})
 
-    try:
-        # Cache bust: add ?v=N to script/link tags in index.html
-        try:
-            config_path_cb = game_path / ".forkarcade.json"
-            if config_path_cb.exists():
-                cb_cfg = json.loads(config_path_cb.read_text())
-                cb_ver = (cb_cfg.get("currentVersion") or 0) + 1
-                index_path = game_path / "index.html"
-                if index_path.exists():
-                    html = index_path.read_text()
-                    html = re.sub(r'(src="(?!https?://)[^"]+?\.js)(\?v=\d+)?(")', rf'\1?v={cb_ver}\3', html)
-                    html = re.sub(r'(href="(?!https?://)[^"]+?\.css)(\?v=\d+)?(")', rf'\1?v={cb_ver}\3', html)
-                    index_path.write_text(html)
-        except Exception as e:
-            results.append(f"Cache bust skipped: {e}")
+# Local script src / stylesheet href, with any previous ?v= (version number or hash)
+_ASSET_REF_RE = re.compile(r'((?:src|href)=")((?!https?://|//)[^"?#]+?\.(?:js|css))(\?v=\w+)?(")')
 
-        try:
-            snapshot_files = _get_snapshot_files(game_path)
-            files_to_add = [f for f in snapshot_files if (game_path / f).exists()]
-            files_to_add += [".forkarcade.json", "_sprites.json", "_maps.json"]
-            run(["git", "add", "--"] + files_to_add, cwd=game_path)
-            run(["git", "commit", "-m", "Publish game"], cwd=game_path)
-        except Exception as e:
-            results.append(f"Git commit skipped: {e}")
-        run(["git", "push", "-u", "origin", "main"], cwd=game_path)
-        results.append("Pushed to GitHub")
 
-        if description:
-            run(["gh", "repo", "edit", f"{ORG}/{slug}", "--description", description])
+def _cache_bust(game_path):
+    """Set ?v=<content hash> on local script/link tags in index.html.
+
+    Unchanged files keep their query string, so browsers only refetch what
+    changed. Idempotent — index.html is only written when a hash moved.
+    Returns the number of references updated.
+    """
+    index_path = game_path / "index.html"
+    if not index_path.exists():
+        return 0
+    html = index_path.read_text()
+    hashes = {}
+    updated = 0
+
+    def ref(m):
+        nonlocal updated
+        name = m.group(2)
+        if name not in hashes:
+            try:
+                hashes[name] = hashlib.sha256((game_path / name).read_bytes()).hexdigest()[:CACHE_BUST_LEN]
+            except OSError:
+                hashes[name] = None
+        if hashes[name] is None:
+            return m.group(0)  # missing file — leave the reference alone
+        query = f"?v={hashes[name]}"
+        if m.group(3) != query:
+            updated += 1
+        return f"{m.group(1)}{name}{query}{m.group(4)}"
+
+    new_html = _ASSET_REF_RE.sub(ref, html)
+    if new_html != html:
+        index_path.write_text(new_html)
+    return updated
+
+
+def _build_summary(build):
+    saved = build["bytes_before"] - build["bytes_after"]
+    pct = round(100 * saved / build["bytes_before"]) if build["bytes_before"] else 0
+    return (
+        f"Build: {build['scripts']} scripts -> {build['bundles']} bundle(s), "
+        f"{build['bytes_before']} -> {build['bytes_after']} bytes ({saved} saved, {pct}%)"
+        + ("" if build["minified"] else "; esbuild not found, not minified")
+    )
+
 
+def _publish_repo_settings(gh, repo, description, topics, timings):
+    """Description, topics and Pages — independent API calls, run concurrently. Returns result lines."""
+    def pages():
         try:
-            run(["gh", "repo", "edit", f"{ORG}/{slug}", "--add-topic", "forkarcade-game"])
+            gh.post(f"/repos/{repo}/pages", {"build_type": "legacy", "source": {"branch": "main", "path": "/"}})
+            return "GitHub Pages enabled"
         except Exception as e:
-            results.append(f"Topic 'forkarcade-game' skipped: {e}")
+            msg = str(e)
+            already = getattr(e, "status", None) == 409 or "already" in msg
+            return "GitHub Pages already enabled" if already else f"Pages warning: {msg}"
 
-        # Add template category as topic (e.g. roguelike, strategy-rpg)
+    def topics_call():
         try:
-            config_path_topic = game_path / ".forkarcade.json"
-            if config_path_topic.exists():
-                cfg = json.loads(config_path_topic.read_text())
-                template = cfg.get("template")
-                if template:
-                    run(["gh", "repo", "edit", f"{ORG}/{slug}", "--add-topic", template])
+            gh.add_topics(repo, topics)  # one read + one write for all topics
+            return f"Topics: {', '.join(topics)}"
         except Exception as e:
-            results.append(f"Template topic skipped: {e}")
+            return f"Topics skipped: {e}"
 
+    def description_call():
         try:
-            run(["gh", "api", f"repos/{ORG}/{slug}/pages", "-X", "POST",
-                 "-f", "build_type=legacy", "-f", "source[branch]=main", "-f", "source[path]=/"])
-            results.append("GitHub Pages enabled")
+            gh.patch(f"/repos/{repo}", {"description": description})
+            return "Description updated"
         except Exception as e:
-            msg = str(e)
-            results.append("GitHub Pages already enabled" if "already exists" in msg else f"Pages warning: {msg}")
+            return f"Description skipped: {e}"
+
+    calls = {"pages": pages, "topics": topics_call}
+    if description:
+        calls["description"] = description_call
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        futures = {stage: pool.submit(_timed, timings, stage, fn) for stage, fn in calls.items()}
+        return [futures[stage].result() for stage in calls]
+
+
+def _rollback_version(game_path, ctx, version, committed, original_config, original_index):
+    """Undo a prepared version that never reached GitHub, so a retry doesn't skip a number.
+
+    Calls git directly rather than through run(): it also runs after the
+    request was cancelled.
+    """
+    if committed:
+        subprocess.run(["git", "reset", "HEAD~1"], cwd=game_path, capture_output=True, timeout=30, check=True)
+    else:  # cancelled between add and commit — unstage what publish staged
+        subprocess.run(
+            ["git", "reset", "-q", "--", "versions", ".forkarcade.json", "index.html"],
+            cwd=game_path, capture_output=True, timeout=30,
+        )
+    ctx.save(original_config)
+    if original_index is not None:
+        (game_path / "index.html").write_text(original_index)
+    # Blobs stay — content-addressed, the retry reuses them
+    shutil.rmtree(game_path / "versions" / f"v{version}", ignore_errors=True)
+
+
+def publish_game(args):
+    game_path = validate_game_path(args["path"])
+    slug = args["slug"]
+    title = args["title"]
+    description = args.get("description", "")
+    results = []
+    timings = {}
+    started = time.perf_counter()
 
-        pages_url = f"https://{ORG.lower()}.github.io/{slug}/"
+    if not re.match(r"^[a-z0-9-]+$", slug):
+        return json.dumps({"error": "Slug must be lowercase alphanumeric with hyphens"})
 
+    ctx = game_context(game_path)
+    snapshot_files = _get_snapshot_files(game_path)
+
+    # Let queued background pushes (thumbnails) land before touching git
+    push = _timed(timings, "flush_queue", push_queue.flush, game_path)
+    if push["state"] == "failed":
+        results.append(f"Queued push failed: {push['last'].get('error')}")
+
+    # 1. Build everything for this version locally: cache-busted index.html,
+    #    snapshot and config update — they go out in a single commit + push.
+    original_config = None
+    original_index = None
+    next_version = None
+    t0 = time.perf_counter()
+    if ctx.exists:
         try:
-            config_path = game_path / ".forkarcade.json"
-            if config_path.exists():
-                config = json.loads(config_path.read_text())
-                next_version = (config.get("currentVersion") or 0) + 1
-                version_dir = game_path / "versions" / f"v{next_version}"
-                version_dir.mkdir(parents=True, exist_ok=True)
-                for f in _get_snapshot_files(game_path):
-                    src = game_path / f
-                    if src.exists():
-                        shutil.copy2(src, version_dir / f)
-                config["currentVersion"] = next_version
-                if "versions" not in config:
-                    config["versions"] = []
-                config["versions"].append({
-                    "version": next_version,
-                    "date": date.today().isoformat(),
-                    "issue": None,
-                    "description": "Initial release" if next_version == 1 else f"Published v{next_version}",
-                })
-                config_path.write_text(json.dumps(config, indent=2) + "\n")
-                run(["git", "add", "versions/", ".forkarcade.json"], cwd=game_path)
-                run(["git", "commit", "-m", f"Version v{next_version}"], cwd=game_path)
-                run(["git", "push"], cwd=game_path)
-                results.append(f"Version v{next_version} snapshot created")
+            config = ctx.editable()
+            if not ctx.valid:
+                raise ValueError("cannot parse .forkarcade.json")
+            next_version = (config.get("currentVersion") or 0) + 1
+            index_path = game_path / "index.html"
+            original_index = index_path.read_text() if index_path.exists() else None
+            try:
+                fmt = sprite_store(game_path).sync_js()
+                if fmt:
+                    results.append(f"sprites.js regenerated (spriteFormat: {fmt})")
+            except Exception as e:
+                results.append(f"sprites.js sync skipped: {e}")
+            try:
+                busted = _cache_bust(game_path)
+                if busted:
+                    results.append(f"Cache bust: {busted} asset reference(s) updated")
+            except Exception as e:
+                results.append(f"Cache bust skipped: {e}")
+            contents = None
+            if args.get("bundle"):
+                try:
+                    contents, build = _timed(timings, "build", bundler.build, game_path, snapshot_files)
+                    results.append(_build_summary(build))
+                except Exception as e:
+                    results.append(f"Build skipped: {e}")
+            _, stats = snapshots.write_snapshot(game_path, next_version, snapshot_files, contents)
+            original_config = ctx.editable()
+            config["currentVersion"] = next_version
+            config.setdefault("versions", []).append({
+                "version": next_version,
+                "date": date.today().isoformat(),
+                "issue": None,
+                "description": "Initial release" if next_version == 1 else f"Published v{next_version}",
+            })
+            ctx.save(config)
+            results.append(
+                f"Version v{next_version} snapshot created "
+                f"({stats['new_blobs']} new files, {stats['new_bytes']} bytes; {stats['reused_blobs']} unchanged)"
+            )
         except Exception as e:
+            next_version = None
             results.append(f"Version snapshot warning: {e}")
+    timings["prepare"] = round((time.perf_counter() - t0) * 1000, 1)
 
-        return json.dumps({
-            "ok": True, "results": results,
-            "repo": f"https://github.com/{ORG}/{slug}",
-            "game_url": pages_url,
-            "platform_url": f"http://localhost:5173/play/{slug}",
-        }, indent=2)
+    committed = False
+    try:
+        files_to_add = snapshot_files + [".forkarcade.json", "_sprites.json", "_maps.json", "versions"]
+        files_to_add = [f for f in files_to_add if (game_path / f).exists()]
+        message = f"Publish v{next_version}" if next_version else "Publish game"
+        _timed(timings, "commit", lambda: (
+            run(["git", "add", "--"] + files_to_add, cwd=game_path),
+            run(["git", "commit", "-m", message], cwd=game_path),
+        ))
+        committed = True
+    except Cancelled:
+        if next_version:
+            _rollback_version(game_path, ctx, next_version, False, original_config, original_index)
+        raise
     except Exception as e:
-        return json.dumps({"error": str(e), "results": results})
+        results.append(f"Git commit skipped: {e}")
+
+    # 2. One push, concurrently with the repo settings calls (they don't depend on it)
+    gh = github_client.client()
+    repo = f"{ORG}/{slug}"
+    topics = ["forkarcade-game"] + ([ctx.get("template")] if ctx.get("template") else [])
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        push_future = pool.submit(_timed, timings, "push", run, ["git", "push", "-u", "origin", "main"], game_path)
+        settings_future = pool.submit(_publish_repo_settings, gh, repo, description, topics, timings)
+        try:
+            push_future.result()
+            push_error = None
+        except Exception as e:
+            push_error = e
+        settings = settings_future.result()  # these calls ran either way — report them
+    if push_error is not None:
+        if next_version:
+            try:
+                _rollback_version(game_path, ctx, next_version, committed, original_config, original_index)
+                results.append(f"Push failed — version v{next_version} rolled back")
+            except Exception as rollback_error:
+                results.append(f"Rollback failed: {rollback_error}")
+        results += settings
+        timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+        return json.dumps({"error": str(push_error), "results": results, "timings": timings})
+    results.append("Pushed to GitHub")
+    results += settings
+
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    return json.dumps({
+        "ok": True, "results": results,
+        "repo": f"https://github.com/{repo}",
+        "game_url": f"https://{ORG.lower()}.github.io/{slug}/",
+        "platform_url": f"http://localhost:5173/play/{slug}",
+        "timings": timings,
+    }, indent=2)
 
 
 def update_sdk(args):
@@ -533,14 +692,16 @@ def update_sdk(args):
             index_path.write_text(new_html)
             engine_updated = True
 
-    config_path = game_path / ".forkarcade.json"
-    if config_path.exists():
+    ctx = game_context(game_path)
+    if ctx.exists:
         try:
-            config = json.loads(config_path.read_text())
+            config = ctx.editable()
+            if not ctx.valid:
+                raise ValueError("cannot parse .forkarcade.json")
             config["sdkVersion"] = sdk_info["version"]
             if engine_updated:
                 config["engineVersion"] = LATEST_ENGINE_VERSION
-            config_path.write_text(json.dumps(config, indent=2) + "\n")
+            ctx.save(config)
         except Exception as e:
             print(f"Warning: failed to update config: {e}", file=sys.stderr)
 
@@ -623,8 +784,7 @@ def apply_data_patch(args):
                     return json.dumps({"error": f"{cat}/{name}: w and h must be integers between 1 and 128"})
                 sprite_count += 1
 
-        (game_path / "_sprites.json").write_text(json.dumps(data, indent=2) + "\n")
-        (game_path / "sprites.js").write_text(generate_sprites_js(data))
+        sprite_store(game_path).replace(data)
 
         return json.dumps({
             "ok": True,
@@ -664,15 +824,19 @@ def delete_game(args):
 
     results = []
 
+    gh = github_client.client()
+
     # 1. Check repo exists
     try:
-        run(["gh", "repo", "view", f"{ORG}/{slug}", "--json", "name"])
-    except RuntimeError:
-        return json.dumps({"error": f"Repository {ORG}/{slug} not found"})
+        gh.get_json(f"/repos/{ORG}/{slug}")
+    except RuntimeError as e:
+        if getattr(e, "status", None) == 404:
+            return json.dumps({"error": f"Repository {ORG}/{slug} not found"})
+        return json.dumps({"error": f"Failed to check repo: {e}"})
 
     # 2. Delete GitHub repo
     try:
-        run(["gh", "repo", "delete", f"{ORG}/{slug}", "--yes"])
+        gh.delete(f"/repos/{ORG}/{slug}")
         results.append(f"Deleted repo {ORG}/{slug}")
     except RuntimeError as e:
         return json.dumps({"error": f"Failed to delete repo: {e}"})
@@ -697,6 +861,7 @@ def delete_game(args):
 
     # 4. Delete local game directory
     game_path = GAMES_DIR / slug
+    push_queue.discard(game_path)
     if game_path.exists():
         shutil.rmtree(game_path)
         results.append(f"Deleted local directory {game_path}")
@@ -704,3 +869,10 @@ def delete_game(args):
         results.append(f"No local directory found at {game_path}")
 
     return json.dumps({"ok": True, "slug": slug, "results": results}, indent=2)
+
+
+def get_push_status(args):
+    path = args.get("path")
+    if path:
+        return json.dumps(push_queue.status(validate_game_path(path)), indent=2)
+    return json.dumps({"queues": push_queue.status()}, indent=2)
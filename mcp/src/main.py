@@ -3,6 +3,9 @@ import sys
 import os
 import json
 import asyncio
+import base64
+import importlib
+import threading
 import traceback
 
 # Add src directory to path for local imports
@@ -13,9 +16,20 @@ import mcp.server.stdio as stdio
 import mcp.types as types
 
 from pathlib import Path
-from context import detect_game_context
+from context import detect_game_context, game_context
+from github_templates import warm_templates, cache_stats
 from tools import TOOLS
-from handlers import workflow, assets, versions, thumbnail
+import executor
+import push_queue
+from handlers import workflow, assets, versions
+
+
+def _lazy(module, func):
+    """Import a handler module on first call — keeps heavy deps (PIL) out of server startup."""
+    def handler(args):
+        return getattr(importlib.import_module(module), func)(args)
+    return handler
+
 
 HANDLERS = {
     "list_templates": workflow.list_templates,
@@ -26,14 +40,17 @@ HANDLERS = {
     "publish_game": workflow.publish_game,
     "get_asset_guide": assets.get_asset_guide,
     "create_sprite": assets.create_sprite,
+    "create_sprites": assets.create_sprites,
     "validate_assets": assets.validate_assets,
     "preview_assets": assets.preview_assets,
     "get_versions": versions.get_versions,
     "update_sdk": workflow.update_sdk,
-    "create_thumbnail": thumbnail.create_thumbnail,
+    "create_thumbnail": _lazy("handlers.thumbnail", "create_thumbnail"),
     "list_evolve_issues": workflow.list_evolve_issues,
     "apply_data_patch": workflow.apply_data_patch,
     "delete_game": workflow.delete_game,
+    "get_push_status": workflow.get_push_status,
+    "get_cache_stats": workflow.get_cache_stats,
 }
 
 
@@ -54,17 +71,24 @@ def _build_instructions():
 app = Server("forkarcade", instructions=_build_instructions())
 
 
+# Tool objects for the current context, rebuilt only when .forkarcade.json changes
+_tools_cache = {"stamp": None, "tools": None}
+
+
 @app.list_tools()
 async def handle_list_tools() -> list[types.Tool]:
-    ctx = detect_game_context()
-    tool_list = TOOLS
-    if ctx:
-        tool_list = [t for t in TOOLS if t["name"] not in ("list_templates", "init_game")]
-    return [types.Tool(**t) for t in tool_list]
+    stamp = game_context().stamp
+    if _tools_cache["tools"] is None or stamp != _tools_cache["stamp"]:
+        tool_list = TOOLS
+        if detect_game_context():
+            tool_list = [t for t in TOOLS if t["name"] not in ("list_templates", "init_game")]
+        _tools_cache["tools"] = [types.Tool(**t) for t in tool_list]
+        _tools_cache["stamp"] = stamp
+    return _tools_cache["tools"]
 
 
 @app.call_tool()
-async def handle_call_tool(name: str, arguments: dict | None) -> list[types.TextContent]:
+async def handle_call_tool(name: str, arguments: dict | None) -> list[types.TextContent | types.ImageContent]:
     ctx = detect_game_context()
     args = dict(arguments or {})
 
@@ -82,19 +106,28 @@ async def handle_call_tool(name: str, arguments: dict | None) -> list[types.Text
     if not handler:
         return [types.TextContent(type="text", text=json.dumps({"error": f"Unknown tool: {name}"}))]
 
+    images = []
     try:
-        result = handler(args)
+        result = await executor.call(name, handler, args)
+        if isinstance(result, tuple):  # (json, [(mime_type, bytes), ...]) — e.g. thumbnail preview
+            result, images = result
     except ValueError as e:
         result = json.dumps({"error": f"Validation failed: {e}"})
     except Exception as e:
         print(traceback.format_exc(), file=sys.stderr)
         result = json.dumps({"error": str(e)})
-    return [types.TextContent(type="text", text=result)]
+    content = [types.TextContent(type="text", text=result)]
+    for mime_type, data in images:
+        content.append(types.ImageContent(type="image", data=base64.b64encode(data).decode(), mimeType=mime_type))
+    return content
 
 
 async def run():
+    threading.Thread(target=warm_templates, name="fa-warm-templates", daemon=True).start()
     async with stdio.stdio_server() as (read_stream, write_stream):
         await app.run(read_stream, write_stream, app.create_initialization_options())
+    push_queue.flush_all()
+    print(f"GitHub cache stats: {json.dumps(cache_stats())}", file=sys.stderr)
 
 
 def main():
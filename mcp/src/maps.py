@@ -1,8 +1,8 @@
 import json
 
 
-def generate_maps_js(data):
-    """Generate maps.js from _maps.json data (dict of named maps)."""
+def generate_maps_js(data, data_json=None):
+    """Generate maps.js from _maps.json data (dict of named maps). data_json: pre-serialized data."""
     lines = [
         "// maps.js — ForkArcade map definitions",
         "// Generated from _maps.json by apply_data_patch tool",
@@ -10,7 +10,7 @@ def generate_maps_js(data):
         "if (!window.FA) window.FA = {};",
         "if (!FA.assets) FA.assets = { spriteDefs: null, spritesheet: null, sheetCols: 16, mapDefs: null };",
         "",
-        "FA.assets.mapDefs = " + json.dumps(data, indent=2),
+        "FA.assets.mapDefs = " + (data_json if data_json is not None else json.dumps(data, indent=2)),
         "",
         "function getMap(name) {",
         "  return FA.assets.mapDefs[name] || null",
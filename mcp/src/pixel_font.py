@@ -0,0 +1,124 @@
+"""Built-in 3x5 pixel font — text layout and rendering for generated images.
+
+Glyph masks are rendered once per scale and whole strings are assembled from
+them, so drawing a title is one paste instead of a call per lit pixel.
+"""
+
+import threading
+
+from PIL import Image
+
+GLYPH_W, GLYPH_H = 3, 5
+ADVANCE = 4  # glyph width + 1px gap
+
+# Each glyph is a list of 5 row strings, 3 chars wide
+PIXEL_FONT = {
+    "A": [".1.", "1.1", "111", "1.1", "1.1"],
+    "B": ["11.", "1.1", "11.", "1.1", "11."],
+    "C": ["111", "1..", "1..", "1..", "111"],
+    "D": ["11.", "1.1", "1.1", "1.1", "11."],
+    "E": ["111", "1..", "111", "1..", "111"],
+    "F": ["111", "1..", "111", "1..", "1.."],
+    "G": ["111", "1..", "1.1", "1.1", "111"],
+    "H": ["1.1", "1.1", "111", "1.1", "1.1"],
+    "I": ["111", ".1.", ".1.", ".1.", "111"],
+    "J": ["111", "..1", "..1", "1.1", "111"],
+    "K": ["1.1", "1.1", "11.", "1.1", "1.1"],
+    "L": ["1..", "1..", "1..", "1..", "111"],
+    "M": ["1.1", "111", "111", "1.1", "1.1"],
+    "N": ["1.1", "111", "111", "111", "1.1"],
+    "O": ["111", "1.1", "1.1", "1.1", "111"],
+    "P": ["111", "1.1", "111", "1..", "1.."],
+    "Q": ["111", "1.1", "1.1", "111", "..1"],
+    "R": ["11.", "1.1", "11.", "1.1", "1.1"],
+    "S": ["111", "1..", "111", "..1", "111"],
+    "T": ["111", ".1.", ".1.", ".1.", ".1."],
+    "U": ["1.1", "1.1", "1.1", "1.1", "111"],
+    "V": ["1.1", "1.1", "1.1", "1.1", ".1."],
+    "W": ["1.1", "1.1", "111", "111", "1.1"],
+    "X": ["1.1", "1.1", ".1.", "1.1", "1.1"],
+    "Y": ["1.1", "1.1", ".1.", ".1.", ".1."],
+    "Z": ["111", "..1", ".1.", "1..", "111"],
+    "0": ["111", "1.1", "1.1", "1.1", "111"],
+    "1": [".1.", "11.", ".1.", ".1.", "111"],
+    "2": ["111", "..1", "111", "1..", "111"],
+    "3": ["111", "..1", "111", "..1", "111"],
+    "4": ["1.1", "1.1", "111", "..1", "..1"],
+    "5": ["111", "1..", "111", "..1", "111"],
+    "6": ["111", "1..", "111", "1.1", "111"],
+    "7": ["111", "..1", "..1", "..1", "..1"],
+    "8": ["111", "1.1", "111", "1.1", "111"],
+    "9": ["111", "1.1", "111", "..1", "111"],
+    " ": ["...", "...", "...", "...", "..."],
+    "-": ["...", "...", "111", "...", "..."],
+    ".": ["...", "...", "...", "...", ".1."],
+    ":": ["...", ".1.", "...", ".1.", "..."],
+    "!": [".1.", ".1.", ".1.", "...", ".1."],
+    "?": ["111", "..1", ".1.", "...", ".1."],
+    "'": [".1.", ".1.", "...", "...", "..."],
+}
+
+_glyph_masks = {}  # (char, scale) -> "L" mask
+_text_masks = {}  # (text, scale) -> "L" mask
+_TEXT_MASK_LIMIT = 256
+_lock = threading.Lock()
+
+
+def _glyph(ch):
+    return PIXEL_FONT.get(ch, PIXEL_FONT.get(" "))
+
+
+def measure(text, scale=1):
+    """(width, height) in pixels of `text` drawn at `scale` (without shadow).
+
+    Text is upper-cased like pixel_text; unknown characters render as spaces.
+    """
+    if not text:
+        return 0, 0
+    return (len(text) * ADVANCE - (ADVANCE - GLYPH_W)) * scale, GLYPH_H * scale
+
+
+def _glyph_mask(ch, scale):
+    key = (ch, scale)
+    mask = _glyph_masks.get(key)
+    if mask is None:
+        mask = Image.new("L", (GLYPH_W, GLYPH_H), 0)
+        for gy, row in enumerate(_glyph(ch) or []):
+            for gx, pixel in enumerate(row):
+                if pixel == "1":
+                    mask.putpixel((gx, gy), 255)
+        if scale > 1:
+            mask = mask.resize((GLYPH_W * scale, GLYPH_H * scale), Image.NEAREST)
+        _glyph_masks[key] = mask
+    return mask
+
+
+def text_mask(text, scale=1):
+    """Coverage mask ("L", 255 = lit) of `text` at `scale`, sized by measure()."""
+    text = text.upper()
+    key = (text, scale)
+    with _lock:
+        mask = _text_masks.get(key)
+        if mask is None:
+            mask = Image.new("L", measure(text, scale), 0)
+            for i, ch in enumerate(text):
+                mask.paste(_glyph_mask(ch, scale), (i * ADVANCE * scale, 0))
+            if len(_text_masks) >= _TEXT_MASK_LIMIT:
+                _text_masks.clear()
+            _text_masks[key] = mask
+        return mask
+
+
+def draw_text(canvas, draw, text, x, y, color, scale=1):
+    """Draw `text` with its top-left corner at (x, y).
+
+    At scale 1 lit pixels replace the canvas pixel; at larger scales they are
+    blended through `draw` (an RGBA ImageDraw), matching the rest of the op set.
+    """
+    if not text:
+        return
+    mask = text_mask(text, scale)
+    if scale > 1:
+        draw.bitmap((x, y), mask, fill=color)
+    else:
+        canvas.paste(color, (x, y, x + mask.width, y + mask.height), mask)
@@ -0,0 +1,200 @@
+"""Background commit + push, one queue per game repo.
+
+Tools whose output only needs to reach GitHub eventually (create_thumbnail)
+hand their files to enqueue() and return right away. Updates that arrive while
+a commit is pending or a push is in flight are coalesced into one commit and
+one push.
+
+Env:
+  FA_PUSH_DELAY — seconds to wait for more updates before committing (default 2)
+"""
+
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+PUSH_DELAY = float(os.environ.get("FA_PUSH_DELAY", "2"))
+GIT_TIMEOUT = 30
+
+
+class _RepoQueue:
+    def __init__(self, game_path):
+        self.game_path = game_path
+        self.cond = threading.Condition()
+        self.pending = {}  # file -> None (ordered set)
+        self.messages = []
+        self.updates = 0  # updates coalesced into the pending commit
+        self.due = 0.0
+        self.flushing = 0
+        self.running = None  # batch being committed/pushed
+        self.last = None  # result of the last batch
+        self.worker = None
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def _queue(game_path, create=True):
+    key = str(Path(game_path).resolve())
+    with _queues_lock:
+        q = _queues.get(key)
+        if q is None and create:
+            q = _queues[key] = _RepoQueue(Path(key))
+        return q
+
+
+def _git(game_path, *args, attempts=3):
+    """Run git; retries while another git process holds the index lock."""
+    for attempt in range(attempts):
+        r = subprocess.run(["git", *args], cwd=game_path, capture_output=True, text=True, timeout=GIT_TIMEOUT)
+        if r.returncode == 0 or "index.lock" not in r.stderr or attempt == attempts - 1:
+            return r
+        time.sleep(0.5)
+
+
+def _commit_and_push(game_path, files, message):
+    """Commit `files` (if changed) and push anything not yet on the remote. Returns (commit, pushed).
+
+    Files that are gone and were never tracked are dropped — git rejects them as pathspecs.
+    """
+    tracked = set(_git(game_path, "ls-files", "-z", "--", *files).stdout.split("\0"))
+    files = [f for f in files if f in tracked or (Path(game_path) / f).exists()]
+    if files:
+        r = _git(game_path, "add", "-A", "--", *files)
+        if r.returncode != 0:
+            raise RuntimeError(r.stderr.strip() or "git add failed")
+        if _git(game_path, "diff", "--cached", "--quiet", "--", *files).returncode != 0:
+            r = _git(game_path, "commit", "-m", message, "--", *files)
+            if r.returncode != 0:
+                raise RuntimeError(r.stderr.strip() or "git commit failed")
+    commit = _git(game_path, "rev-parse", "--short", "HEAD").stdout.strip() or None
+    ahead = _git(game_path, "rev-list", "--count", "@{u}..HEAD")
+    if ahead.returncode == 0 and ahead.stdout.strip() == "0":
+        return commit, False  # remote already has it
+    r = _git(game_path, "push")
+    if r.returncode != 0:
+        raise RuntimeError(r.stderr.strip() or "git push failed")
+    return commit, True
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _worker(q):
+    while True:
+        with q.cond:
+            while True:
+                if not q.pending:
+                    q.worker = None
+                    q.cond.notify_all()
+                    return
+                wait = q.due - time.monotonic()
+                if wait <= 0 or q.flushing:
+                    break
+                q.cond.wait(wait)
+            files, messages, updates = list(q.pending), q.messages, q.updates
+            q.pending, q.messages, q.updates = {}, [], 0
+            q.running = {"files": files, "updates": updates, "started": _now()}
+
+        batch = {"files": files, "updates": updates}
+        try:
+            commit, pushed = _commit_and_push(q.game_path, files, "; ".join(messages))
+            batch.update(state="pushed" if pushed else "committed", commit=commit)
+        except Exception as e:
+            batch.update(state="failed", error=str(e))
+        batch["at"] = _now()
+
+        with q.cond:
+            q.running = None
+            q.last = batch
+            q.cond.notify_all()
+
+
+def enqueue(game_path, files, message):
+    """Queue `files` (relative to the repo) for a background commit + push. Returns status()."""
+    q = _queue(game_path)
+    with q.cond:
+        q.pending.update(dict.fromkeys(files))
+        if message not in q.messages:
+            q.messages.append(message)
+        q.updates += 1
+        q.due = time.monotonic() + PUSH_DELAY
+        if q.worker is None:
+            q.worker = threading.Thread(target=_worker, args=(q,), name=f"fa-push-{q.game_path.name}", daemon=True)
+            q.worker.start()
+        q.cond.notify_all()
+    return status(game_path)
+
+
+def flush(game_path, timeout=60):
+    """Commit + push anything queued for the repo now and wait for it. Returns status()."""
+    q = _queue(game_path, create=False)
+    if q is None:
+        return status(game_path)
+    deadline = time.monotonic() + timeout
+    with q.cond:
+        q.flushing += 1
+        q.cond.notify_all()
+        try:
+            while (q.pending or q.running) and time.monotonic() < deadline:
+                q.cond.wait(deadline - time.monotonic())
+        finally:
+            q.flushing -= 1
+    return status(game_path)
+
+
+def flush_all(timeout=60):
+    """flush() every repo with queued updates — called on server shutdown."""
+    with _queues_lock:
+        paths = list(_queues)
+    for path in paths:
+        flush(path, timeout)
+
+
+def discard(game_path, timeout=30):
+    """Drop queued updates for the repo (e.g. it is being deleted) and wait for an in-flight push."""
+    q = _queue(game_path, create=False)
+    if q is None:
+        return
+    deadline = time.monotonic() + timeout
+    with q.cond:
+        q.pending, q.messages, q.updates = {}, [], 0
+        q.cond.notify_all()
+        while q.running and time.monotonic() < deadline:
+            q.cond.wait(deadline - time.monotonic())
+    with _queues_lock:
+        _queues.pop(str(q.game_path), None)
+
+
+def status(game_path=None):
+    """Queue state for one repo, or a list for every repo with a queue.
+
+    state: idle | queued | running | pushed | committed | failed. `last` is the
+    outcome of the most recent batch.
+    """
+    if game_path is None:
+        with _queues_lock:
+            paths = list(_queues)
+        return [status(p) for p in paths]
+    q = _queue(game_path, create=False)
+    result = {"path": str(Path(game_path).resolve()), "state": "idle"}
+    if q is None:
+        return result
+    with q.cond:
+        if q.running:
+            result["state"] = "running"
+            result["running"] = dict(q.running)
+        elif q.pending:
+            result["state"] = "queued"
+        elif q.last:
+            result["state"] = q.last["state"]
+        if q.pending:
+            result["pending"] = {"files": list(q.pending), "updates": q.updates}
+        if q.last:
+            result["last"] = dict(q.last)
+    return result
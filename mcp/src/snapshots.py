@@ -0,0 +1,125 @@
+"""Content-addressed version snapshots.
+
+Each unique file content is stored once under versions/blobs/<sha>/<name> and
+every version gets a small directory with a manifest and an index.html whose
+script/link references point at the blobs:
+
+  versions/blobs/3f2a…/game.js
+  versions/v3/manifest.json   {"version": 3, "files": {"game.js": {"sha", "size"}, ...}}
+  versions/v3/index.html      <script src="../blobs/3f2a…/game.js">
+
+index.html itself is listed in the manifest (for diffs) but not stored as a
+blob — the rewritten copy in vN/ is the one that is served. No leading "_" in
+the blob dir: Jekyll (legacy GitHub Pages builds) drops such paths.
+
+GitHub Pages serves versions/vN/ as before. Versions published before the blob
+store (full copies in versions/vN/) stay readable — read_manifest() hashes them.
+"""
+
+import hashlib
+import json
+import re
+from datetime import date
+from pathlib import Path
+
+BLOBS_DIR = "blobs"
+MANIFEST = "manifest.json"
+SHA_LEN = 20  # hex chars kept in blob paths
+
+# src="…" / href="…" attributes — group 2 is the path, group 3 an optional ?query
+_REF_RE = re.compile(r'((?:src|href)=")([^"?#]+)(\?[^"#]*)?(")')
+
+
+def _sha(data):
+    return hashlib.sha256(data).hexdigest()[:SHA_LEN]
+
+
+def blob_path(sha, name):
+    """Blob location relative to versions/. Keeps the file name (type, sdk detection)."""
+    return f"{BLOBS_DIR}/{sha}/{Path(name).name}"
+
+
+def _rewrite_index(html, files):
+    def ref(m):
+        entry = files.get(m.group(2).removeprefix("./"))
+        if not entry:
+            return m.group(0)
+        return f"{m.group(1)}../{blob_path(entry['sha'], m.group(2))}{m.group(4)}"  # no ?v= — blobs never change
+    return _REF_RE.sub(ref, html)
+
+
+def write_snapshot(game_path, version, names, contents=None):
+    """Snapshot `names` (relative to game_path, missing ones skipped) as version N.
+
+    contents: {name: bytes} to snapshot instead of reading `names` from disk
+    (the publish build stage — see bundler.build()).
+    Returns (manifest, stats) — stats counts blobs written vs reused.
+    """
+    if contents is None:
+        contents = {}
+        for name in names:
+            src = Path(game_path) / name
+            if src.is_file():
+                contents[name] = src.read_bytes()
+
+    versions_dir = Path(game_path) / "versions"
+    files, stats = {}, {"new_blobs": 0, "new_bytes": 0, "reused_blobs": 0}
+    for name, data in contents.items():
+        sha = _sha(data)
+        files[name] = {"sha": sha, "size": len(data)}
+        if name == "index.html":
+            continue  # written rewritten into vN/ below
+        blob = versions_dir / blob_path(sha, name)
+        if blob.exists():
+            stats["reused_blobs"] += 1
+            continue
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        blob.write_bytes(data)
+        stats["new_blobs"] += 1
+        stats["new_bytes"] += len(data)
+
+    manifest = {"version": version, "date": date.today().isoformat(), "files": files}
+    version_dir = versions_dir / f"v{version}"
+    version_dir.mkdir(parents=True, exist_ok=True)
+    (version_dir / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n")
+    if "index.html" in contents:
+        (version_dir / "index.html").write_text(_rewrite_index(contents["index.html"].decode(), files))
+    return manifest, stats
+
+
+def read_manifest(game_path, version):
+    """Manifest of version N, or None if the version has no snapshot.
+
+    Legacy full-copy snapshots get a manifest computed from their files
+    (marked "legacy": true).
+    """
+    version_dir = Path(game_path) / "versions" / f"v{version}"
+    try:
+        return json.loads((version_dir / MANIFEST).read_text())
+    except FileNotFoundError:
+        pass
+    if not version_dir.is_dir():
+        return None
+    files = {}
+    for path in sorted(version_dir.rglob("*")):
+        if path.is_file():
+            data = path.read_bytes()
+            files[path.relative_to(version_dir).as_posix()] = {"sha": _sha(data), "size": len(data)}
+    return {"version": version, "legacy": True, "files": files}
+
+
+def diff_manifests(old, new):
+    """Files added, removed and changed between two manifests."""
+    a, b = old.get("files", {}), new.get("files", {})
+    changed = [
+        {"file": f, "size": [a[f]["size"], b[f]["size"]]}
+        for f in a if f in b and a[f]["sha"] != b[f]["sha"]
+    ]
+    return {
+        "from": old.get("version"),
+        "to": new.get("version"),
+        "added": [f for f in b if f not in a],
+        "removed": [f for f in a if f not in b],
+        "changed": changed,
+        "unchanged": sum(1 for f in a if f in b and a[f]["sha"] == b[f]["sha"]),
+    }
@@ -1,4 +1,13 @@
+import base64
 import json
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from context import game_context
 
 
 def migrate_sprite_data(data):
@@ -12,21 +21,302 @@ def migrate_sprite_data(data):
     return data
 
 
-def generate_sprites_js(data):
+# sprites.js output formats, chosen per game with "spriteFormat" in .forkarcade.json:
+#   json   — frames as indented arrays of row strings (default)
+#   packed — compact JSON, frames as base64 palette indices, expanded back to rows on load
+SPRITE_FORMATS = ("json", "packed")
+PACKED_MARKER = "(spriteFormat: packed)"
+
+# Expands packed sprites into the row-string frames fa-renderer.js draws from.
+# Frame = base64 of [mode, ...]: mode 0 — indices into `chars`, `bits` per pixel,
+# MSB first; mode 1 — (count, index) run pairs.
+PACKED_DECODER = """function (defs) {
+  var luts = {}  // chars + bits -> byte value -> its pixels, shared by sprites with the same palette
+  function lut(chars, bits) {
+    var key = bits + chars
+    if (luts[key]) return luts[key]
+    var t = [], per = 8 / bits, mask = (1 << bits) - 1
+    for (var b = 0; b < 256; b++) {
+      var px = ''
+      for (var k = 1; k <= per; k++) px += chars.charAt(b >> (8 - bits * k) & mask)
+      t.push(px)
+    }
+    return (luts[key] = t)
+  }
+  for (var cat in defs) for (var name in defs[cat]) {
+    var s = defs[cat][name]
+    if (!s.packed) continue
+    s.frames = s.packed.map(function (b64) {
+      var bin = atob(b64), px = '', rows = [], i, n = s.w * s.h
+      if (bin.charCodeAt(0) === 1) {
+        for (i = 1; i < bin.length; i += 2) px += s.chars.charAt(bin.charCodeAt(i + 1)).repeat(bin.charCodeAt(i))
+      } else {
+        var t = lut(s.chars, s.bits)
+        for (i = 1; i < bin.length; i++) px += t[bin.charCodeAt(i)]
+      }
+      for (i = 0; i < n; i += s.w) rows.push(px.slice(i, i + s.w))
+      return rows
+    })
+    delete s.packed; delete s.chars; delete s.bits
+  }
+  return defs
+}"""
+
+
+def sprite_format(game_path):
+    """The game's sprites.js format from .forkarcade.json ("json" if unset or unknown)."""
+    fmt = game_context(game_path).get("spriteFormat", "json")
+    if fmt not in SPRITE_FORMATS:
+        print(f"Warning: unknown spriteFormat {fmt!r}, using json", file=sys.stderr)
+        return "json"
+    return fmt
+
+
+_RUN_RE = re.compile(rb"((.)\2*)", re.S)
+
+# Index -> its digit in base 2 ** bits ("0"-"f"); int(digits, base) then packs the bits
+_DIGITS = bytes.maketrans(bytes(range(16)), b"0123456789abcdef")
+
+
+def _pack_frame(indices, bits):
+    """base64 of the shorter of bit-packed (mode 0) and run-length (mode 1) encodings."""
+    if bits == 8:
+        raw = b"\0" + indices
+    else:
+        per = 8 // bits
+        digits = indices.translate(_DIGITS) + b"0" * (-len(indices) % per)
+        raw = b"\0" + int(digits, 1 << bits).to_bytes(len(digits) // per, "big")
+    # Runs = pixels minus positions equal to their predecessor (XOR of the shifted bytes is 0)
+    n = len(indices)
+    same = (int.from_bytes(indices[1:], "big") ^ int.from_bytes(indices[:-1], "big")).to_bytes(n - 1, "big").count(0)
+    if 1 + 2 * (n - same) >= len(raw):
+        return base64.b64encode(raw).decode()
+    rle = bytearray([1])
+    for run, idx in _RUN_RE.findall(indices):
+        n = len(run)
+        while n > 255:
+            rle += bytes((255, idx[0]))
+            n -= 255
+        rle += bytes((n, idx[0]))
+    return base64.b64encode(min(raw, rle, key=len)).decode()
+
+
+def pack_sprite(sprite):
+    """Packed form of one sprite (frames -> chars/bits/packed), or the sprite
+    unchanged if its frames aren't a regular w x h grid the decoder can rebuild."""
+    w, h, frames = sprite.get("w"), sprite.get("h"), sprite.get("frames")
+    if not (isinstance(w, int) and isinstance(h, int) and w > 0 and h > 0 and isinstance(frames, list) and frames):
+        return sprite
+    if any(not isinstance(f, list) or len(f) != h or any(not isinstance(r, str) or len(r) != w for r in f) for f in frames):
+        return sprite
+    chars = "".join(sorted(set("".join(r for f in frames for r in f))))
+    if len(chars) > 256:
+        return sprite
+    bits = next(b for b in (1, 2, 4, 8) if len(chars) <= 1 << b)
+    table = str.maketrans({c: chr(i) for i, c in enumerate(chars)})
+    packed = {k: v for k, v in sprite.items() if k != "frames"}
+    packed["chars"] = chars
+    packed["bits"] = bits
+    packed["packed"] = [_pack_frame("".join(f).translate(table).encode("latin-1"), bits) for f in frames]
+    return packed
+
+
+def pack_sprite_data(data):
+    return {cat: {name: pack_sprite(s) for name, s in sprites.items()} for cat, sprites in data.items()}
+
+
+def generate_sprites_js(data, data_json=None, fmt="json"):
+    """sprites.js source. data_json: the serialized data, if already done —
+    json.dumps(data, indent=2), or compact JSON of pack_sprite_data(data) for fmt "packed"."""
+    if fmt == "packed":
+        if data_json is None:
+            data_json = json.dumps(pack_sprite_data(data), separators=(",", ":"))
+        assign = f"FA.assets.spriteDefs = ({PACKED_DECODER})({data_json})"
+    else:
+        assign = "FA.assets.spriteDefs = " + (data_json if data_json is not None else json.dumps(data, indent=2))
     lines = [
         "// sprites.js — ForkArcade sprite data",
-        "// Generated from _sprites.json by create_sprite tool",
+        "// Generated from _sprites.json by create_sprite tool" + (f" {PACKED_MARKER}" if fmt == "packed" else ""),
         "// Runtime (drawSprite, getSprite, spriteFrames) lives in fa-renderer.js",
         "",
         "if (!window.FA) window.FA = {};",
         "if (!FA.assets) FA.assets = { spriteDefs: null, spritesheet: null, sheetCols: 16, mapDefs: null };",
         "",
-        "FA.assets.spriteDefs = " + json.dumps(data, indent=2),
+        assign,
         "",
     ]
     return "\n".join(lines)
 
 
+class SpriteStore:
+    """_sprites.json of one game, kept parsed (and migrated) in memory across calls.
+
+    The document is reloaded only when the file's mtime/size changes. Callers
+    mutate `data` in place, report what they touched with `changed()` and call
+    `save()`. Serialization reuses the cached JSON of untouched sprites, and the
+    output is byte-identical to json.dumps(data, indent=2). Inside `batch()`
+    saves are deferred to a single flush at the end.
+    """
+
+    def __init__(self, game_path):
+        self.game_path = Path(game_path)
+        self.json_path = self.game_path / "_sprites.json"
+        self.js_path = self.game_path / "sprites.js"
+        self.lock = threading.RLock()
+        self._data = None
+        self._stamp = None
+        self._fragments = {}  # (category, name) -> serialized sprite at nesting depth 2
+        self._packed = {}  # (category, name) -> compact JSON of pack_sprite()
+        self._batch_depth = 0
+        self._dirty = False
+
+    def _file_stamp(self):
+        try:
+            st = self.json_path.stat()
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    @property
+    def data(self):
+        with self.lock:
+            stamp = self._file_stamp()
+            if self._data is None or (stamp != self._stamp and not self._dirty):
+                self._data = {}
+                if stamp is not None:
+                    try:
+                        self._data = migrate_sprite_data(json.loads(self.json_path.read_text()))
+                    except Exception as e:
+                        print(f"Warning: failed to parse {self.json_path}: {e}", file=sys.stderr)
+                self._stamp = stamp
+                self._fragments.clear()
+                self._packed.clear()
+            return self._data
+
+    @property
+    def stamp(self):
+        """(mtime_ns, size) of _sprites.json as last loaded or saved; None if missing."""
+        with self.lock:
+            self.data
+            return self._stamp
+
+    def changed(self, category=None, name=None):
+        """Mark a sprite (or, with no args, everything) as modified."""
+        with self.lock:
+            if category is None:
+                self._fragments.clear()
+                self._packed.clear()
+            else:
+                self._fragments.pop((category, name), None)
+                self._packed.pop((category, name), None)
+            self._dirty = True
+
+    def replace(self, data):
+        """Replace the whole document (written as given, migrated on next load)."""
+        with self.lock:
+            self._data = data
+            self.changed()
+            self.save()
+            self._data = None
+
+    def save(self):
+        with self.lock:
+            self._dirty = True
+            if self._batch_depth == 0:
+                self.flush()
+
+    @contextmanager
+    def batch(self):
+        """Defer save() calls until the outermost batch exits (one write of each file)."""
+        with self.lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._dirty:
+                    self.flush()
+
+    def _serialize(self):
+        if not self._data:
+            return json.dumps(self._data, indent=2)
+        cats = []
+        for cat, sprites in self._data.items():
+            if not sprites:
+                cats.append(f"  {json.dumps(cat)}: {{}}")
+                continue
+            items = []
+            for name, sprite in sprites.items():
+                frag = self._fragments.get((cat, name))
+                if frag is None:
+                    frag = self._fragments[(cat, name)] = json.dumps(sprite, indent=2).replace("\n", "\n    ")
+                items.append(f"    {json.dumps(name)}: {frag}")
+            cats.append(f"  {json.dumps(cat)}: {{\n" + ",\n".join(items) + "\n  }")
+        return "{\n" + ",\n".join(cats) + "\n}"
+
+    def _serialize_packed(self):
+        """Compact JSON of pack_sprite_data(data), reusing packed sprites that didn't change."""
+        cats = []
+        for cat, sprites in self._data.items():
+            items = []
+            for name, sprite in sprites.items():
+                frag = self._packed.get((cat, name))
+                if frag is None:
+                    frag = self._packed[(cat, name)] = json.dumps(pack_sprite(sprite), separators=(",", ":"))
+                items.append(f"{json.dumps(name)}:{frag}")
+            cats.append(f"{json.dumps(cat)}:{{" + ",".join(items) + "}")
+        return "{" + ",".join(cats) + "}"
+
+    def _sprites_js(self, fmt, data_json):
+        if fmt == "packed":
+            return generate_sprites_js(self._data, self._serialize_packed(), fmt)
+        return generate_sprites_js(self._data, data_json)
+
+    def flush(self):
+        """Write _sprites.json and sprites.js (temp files, then rename both)."""
+        with self.lock:
+            data_json = self._serialize()
+            tmp_json = self.json_path.with_name(f".{self.json_path.name}.{os.getpid()}.tmp")
+            tmp_js = self.js_path.with_name(f".{self.js_path.name}.{os.getpid()}.tmp")
+            tmp_json.write_text(data_json + "\n")
+            tmp_js.write_text(self._sprites_js(sprite_format(self.game_path), data_json))
+            os.replace(tmp_json, self.json_path)
+            os.replace(tmp_js, self.js_path)
+            self._stamp = self._file_stamp()
+            self._dirty = False
+
+    def sync_js(self):
+        """Rewrite sprites.js if it isn't in the game's spriteFormat (e.g. after
+        .forkarcade.json was edited). Returns the format written, or None."""
+        with self.lock:
+            if not self.data or not self.js_path.exists():
+                return None
+            fmt = sprite_format(self.game_path)
+            with open(self.js_path, encoding="utf-8") as f:
+                head = f.read(200)
+            if (PACKED_MARKER in head) == (fmt == "packed"):
+                return None
+            data_json = self._serialize() if fmt == "json" else None
+            tmp_js = self.js_path.with_name(f".{self.js_path.name}.{os.getpid()}.tmp")
+            tmp_js.write_text(self._sprites_js(fmt, data_json))
+            os.replace(tmp_js, self.js_path)
+            return fmt
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def sprite_store(game_path):
+    """SpriteStore for a game directory. One instance per path."""
+    key = str(Path(game_path).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SpriteStore(key)
+        return store
+
+
 def generate_preview_html(data):
     sprites_json = json.dumps(data).replace("</", "<\\/")
     return f"""<!DOCTYPE html>
@@ -56,6 +56,7 @@ TOOLS = [
                 "slug": {"type": "string", "description": "Game slug (repo name)"},
                 "title": {"type": "string", "description": "Game title"},
                 "description": {"type": "string", "description": "Game description"},
+                "bundle": {"type": "boolean", "description": "Build step: bundle local scripts (compact sprite/map JSON, minified if esbuild is installed) into the version snapshot (versions/vN/). The root index.html, which the platform plays by default, and the working files stay unbundled. Default false"},
             },
             "required": ["path", "slug", "title"],
         },
@@ -88,6 +89,32 @@ TOOLS = [
             "required": ["path", "category", "name", "palette", "pixels"],
         },
     },
+    {
+        "name": "create_sprites",
+        "description": "Creates many pixel art sprites in one call — all entries are validated first (per-entry errors, nothing written on failure), then saved to _sprites.json and sprites.js in a single write. Each entry replaces the sprite with the given frames. Use to fill a template's whole asset guide at once.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "path": {"type": "string", "description": "Path to the game directory"},
+                "sprites": {
+                    "type": "array",
+                    "description": 'List of sprites: {"category", "name", "palette", "frames": [[row, ...], ...], "origin": [ox, oy]}',
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "category": {"type": "string", "description": "Category: tiles, enemies, items, player, effects, terrain, units, ui"},
+                            "name": {"type": "string", "description": "Sprite name"},
+                            "palette": {"type": "object", "description": 'Character-to-hex color map: { "1": "#a86", "2": "#d9a" }'},
+                            "frames": {"type": "array", "items": {"type": "array", "items": {"type": "string"}}, "description": 'Pixel grids, one per animation frame — rows of chars, "." = transparent'},
+                            "origin": {"type": "array", "items": {"type": "integer"}, "description": "Anchor point [ox, oy]. Default [0,0]."},
+                        },
+                        "required": ["category", "name", "palette", "frames"],
+                    },
+                },
+            },
+            "required": ["path", "sprites"],
+        },
+    },
     {
         "name": "validate_assets",
         "description": "Checks if the game has all required sprites for its type",
@@ -113,11 +140,13 @@ TOOLS = [
     },
     {
         "name": "get_versions",
-        "description": "Returns the game's version history from .forkarcade.json",
+        "description": "Returns the game's version history from .forkarcade.json. With version: the snapshot's file list (name, sha, size). With diff: files added/removed/changed between two snapshots.",
         "inputSchema": {
             "type": "object",
             "properties": {
                 "path": {"type": "string", "description": "Path to the game directory"},
+                "version": {"type": "integer", "description": "Show the file manifest of this version's snapshot"},
+                "diff": {"type": "array", "items": {"type": "integer"}, "description": "Compare two snapshots: [from_version, to_version]"},
             },
             "required": ["path"],
         },
@@ -135,7 +164,7 @@ TOOLS = [
     },
     {
         "name": "create_thumbnail",
-        "description": """Creates a game thumbnail (72x32 PNG). Multi-layer painting — from general to detail. Auto-commit + push.
+        "description": """Creates a game thumbnail (72x32 PNG). Multi-layer painting — from general to detail. Returns a preview image right away; commit + push run in the background (repeated updates are pushed together — check get_push_status, or pass wait:true).
 
 == ART STYLE ==
 Match the style to the game's mood. If none fits perfectly — pick one at random:
@@ -176,7 +205,7 @@ OPERATIONS (in ops):
 - {"dither": {"color":, "density":, "seed":, x, y, w, h}}
 - {"pixels": {"palette":{"char":"#hex"}, "rows":["..."], x, y}}
 - {"sprite": {"category":, "name":, "x":, "y":, "scale":, "frame":}} — render sprite from game's _sprites.json. category+name lookup (e.g. "units"/"warrior"). scale=pixel size (1=1:1, 2=2x, etc.). frame=index (default 0).
-- {"pixel_text": {"text":, "x":, "y":, "color":, "shadow":, "scale":}} — built-in 3x5 pixel font (A-Z, 0-9, space, punctuation). shadow=offset color. scale=pixel size.
+- {"pixel_text": {"text":, "x":, "y":, "color":, "shadow":, "scale":, "align":}} — built-in 3x5 pixel font (A-Z, 0-9, space, punctuation). shadow=offset color. scale=pixel size. align="left"|"center"|"right" anchors the text at x (use center + x=w/2 for titles). Text width = (4*len-1)*scale.
 - {"hex_grid": {"cols":, "rows":, "hex_size":, "x":, "y":, "terrain":[[row of terrain names]], "colors":{"name":"#hex"}, "outline":, "outline_width":, "default_color":}} — hex grid with terrain coloring. Odd rows offset right.
 '.' = transparent. Colors with alpha: "#rrggbbaa".
 
@@ -208,6 +237,12 @@ OPERATIONS (in ops):
    fill or gradient — subtle color overlay on bottom = depth.
    This is the last layer — enhances atmospheric perspective.
 
+== EXTRA SIZES / FORMATS ==
+outputs: [{w, h, format}] renders the same layers at more sizes in the same call and commit (retina cards, social previews).
+format: "png" | "webp" (lossless) | "png8" (256-color palette PNG). Files: _thumbnail-{w}x{h}.png / .webp / -8bit.png.
+_thumbnail.png (w x h) is always written. All generated files are listed under "thumbnails" in .forkarcade.json (committed with the images only when that is its sole uncommitted change).
+Design for the base 72x32 — layer res stays the same, each output just resamples it.
+
 == TITLE ==
 Title text (pixel_text) is OPTIONAL. Not every thumbnail needs a title overlay.
 Use it when the image alone doesn't clearly identify the game. Skip it when the scene is strong enough on its own — let the art speak.""",
@@ -220,10 +255,31 @@ Use it when the image alone doesn't clearly identify the game. Skip it when the
                     "description": "Layers from back to front. Each: {res:[w,h], aa:string, opacity:float, ops:[...]}",
                     "items": {"type": "object"},
                 },
+                "outputs": {
+                    "type": "array",
+                    "description": "Optional extra outputs: [{w, h, format: png|webp|png8}] (max 8, up to 1024x1024)",
+                    "items": {"type": "object"},
+                },
+                "wait": {"type": "boolean", "description": "Wait for the commit + push to finish (default false — pushed in the background)"},
             },
             "required": ["path", "layers"],
         },
     },
+    {
+        "name": "get_push_status",
+        "description": "Shows background commit/push state (queued, running, pushed, committed, failed) for a game, or for every game with queued pushes.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "path": {"type": "string", "description": "Path to the game directory (optional — all queues if omitted)"},
+            },
+        },
+    },
+    {
+        "name": "get_cache_stats",
+        "description": "Shows this MCP server's template cache counters (hits, misses, stale serves, refreshes) and GitHub API requests made (incl. 304 revalidations, rate limits).",
+        "inputSchema": {"type": "object", "properties": {}},
+    },
     {
         "name": "list_evolve_issues",
         "description": "Lists open issues with the 'evolve' label — ready to implement. Shows all games from platform context, or current game only from game context.",
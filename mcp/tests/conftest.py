@@ -0,0 +1,102 @@
+import json
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+
+class StubGitHub:
+    """Local stand-in for api.github.com.
+
+    `routes` maps (method, path) to a handler(request) returning
+    (status, headers, body); body may be a dict/list (sent as JSON).
+    Every request is recorded in `requests` as {"method", "path", "headers", "body"}.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like GitHub
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                req = {
+                    "method": self.command,
+                    "path": self.path,
+                    "headers": {k.lower(): v for k, v in self.headers.items()},
+                    "body": self.rfile.read(length) if length else b"",
+                }
+                stub.requests.append(req)
+                route = stub.routes.get((self.command, self.path.split("?")[0]))
+                status, headers, body = route(req) if route else (404, {}, {"message": "Not Found"})
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def gh_stub(monkeypatch):
+    """A StubGitHub wired in as the shared github_client.client()."""
+    import github_client
+
+    stub = StubGitHub()
+    monkeypatch.setattr(github_client, "_client", github_client.GitHubClient(stub.url, token="test-token"))
+    yield stub
+    stub.close()
+
+
+def _git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def game_repo(tmp_path, monkeypatch):
+    """A game repo under a temporary GAMES_DIR, pushed to a local bare remote.
+
+    Returns the game path; the remote is at game_path.parent.parent / "remote.git".
+    """
+    import context
+
+    games = tmp_path / "games"
+    game = games / "g"
+    game.mkdir(parents=True)
+    remote = tmp_path / "remote.git"
+    _git(tmp_path, "init", "-q", "--bare", "-b", "main", str(remote))
+    _git(game, "init", "-q", "-b", "main")
+    _git(game, "config", "user.email", "test@example.com")
+    _git(game, "config", "user.name", "test")
+    (game / ".forkarcade.json").write_text(json.dumps({"template": "strategy-rpg", "currentVersion": 0}, indent=2) + "\n")
+    _git(game, "add", ".forkarcade.json")
+    _git(game, "commit", "-q", "-m", "init")
+    _git(game, "remote", "add", "origin", str(remote))
+    _git(game, "push", "-q", "-u", "origin", "main")
+    monkeypatch.setattr(context, "GAMES_DIR", games)
+    return game
@@ -0,0 +1,42 @@
+"""Publish bundle build: sprite/map data regenerated from the editable sources."""
+
+import json
+
+import pytest
+
+import bundler
+
+INDEX = '<script src="forkarcade-sdk.js"></script>\n<script src="sprites.js"></script>\n<script src="game.js"></script>\n'
+NAMES = ["index.html", "forkarcade-sdk.js", "sprites.js", "game.js"]
+
+
+@pytest.fixture
+def game(tmp_path, monkeypatch):
+    monkeypatch.setattr(bundler.shutil, "which", lambda name: None)  # no esbuild — plain concatenation
+    (tmp_path / "index.html").write_text(INDEX)
+    (tmp_path / "forkarcade-sdk.js").write_text("// sdk")
+    (tmp_path / "sprites.js").write_text("var SPRITE_DEFS = {\"stale\": {}}\n")
+    (tmp_path / "game.js").write_text("'use strict'\nstart()\n")
+    return tmp_path
+
+
+def _bundle(game):
+    contents, stats = bundler.build(game, NAMES)
+    return contents["bundle.js"].decode(), contents, stats
+
+
+def test_legacy_sprites_are_migrated_in_the_bundle(game):
+    legacy = {"units": {"knight": {"palette": {"1": "#fff"}, "pixels": ["1.", ".1"]}}}
+    (game / "_sprites.json").write_text(json.dumps(legacy))
+
+    js, contents, stats = _bundle(game)
+    assert '"frames":[["1.",".1"]]' in js and '"origin":[0,0]' in js
+    assert "pixels" not in js and "stale" not in js
+    assert stats["scripts"] == 2 and stats["bundles"] == 1
+    assert contents["index.html"].decode().count("<script") == 2  # sdk + bundle
+
+
+def test_sprites_js_is_bundled_as_is_without_editable_source(game):
+    js, _, _ = _bundle(game)
+    assert '"stale"' in js
+    assert js.index(";// sprites.js") < js.index(";// game.js")
@@ -0,0 +1,51 @@
+"""create_sprites batch validation."""
+
+import json
+
+import pytest
+
+import context
+from handlers import assets
+
+DOT = {"1": "#fff"}
+
+
+@pytest.fixture
+def game(tmp_path, monkeypatch):
+    monkeypatch.setattr(context, "GAMES_DIR", tmp_path)
+    path = tmp_path / "g"
+    path.mkdir()
+    return path
+
+
+def _entry(**overrides):
+    entry = {"category": "items", "name": "coin", "palette": DOT, "frames": [["1.", ".1"]]}
+    entry.update(overrides)
+    return entry
+
+
+def test_valid_batch_is_written_once(game):
+    result = json.loads(assets.create_sprites({"path": str(game), "sprites": [_entry(), _entry(name="gem")]}))
+    assert result["ok"] and result["sprites"] == ["items/coin", "items/gem"]
+    data = json.loads((game / "_sprites.json").read_text())
+    assert set(data["items"]) == {"coin", "gem"}
+    assert (game / "sprites.js").exists()
+
+
+@pytest.mark.parametrize("field,value", [
+    ("name", ["coin"]),  # unhashable — used to raise TypeError at the duplicate check
+    ("name", 7),  # would become a non-string key in _sprites.json
+    ("category", {"items": 1}),
+    ("category", None),
+])
+def test_non_string_category_or_name_is_a_per_entry_error(game, field, value):
+    result = json.loads(assets.create_sprites({"path": str(game), "sprites": [_entry(name="ok"), _entry(**{field: value})]}))
+    assert "nothing written" in result["error"]
+    assert [e["index"] for e in result["errors"]] == [1]
+    assert result["errors"][0]["error"] == f"'{field}' must be a string"
+    assert not (game / "_sprites.json").exists()
+
+
+def test_duplicates_in_batch_are_rejected(game):
+    result = json.loads(assets.create_sprites({"path": str(game), "sprites": [_entry(), _entry()]}))
+    assert result["errors"][0]["error"] == "duplicate sprite items/coin in batch"
@@ -0,0 +1,68 @@
+"""executor.call: locks and cancellation around the worker pool."""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import executor
+
+
+@pytest.fixture(autouse=True)
+def one_worker(monkeypatch):
+    # One thread: a job submitted after a call runs only once that call's
+    # handler and done callbacks have finished
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(executor, "_pool", pool)
+    monkeypatch.setattr(executor, "_path_locks", {})
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def test_worker_finishing_after_the_loop_closed_does_not_raise(tmp_path, caplog, one_worker):
+    started, finish = threading.Event(), threading.Event()
+
+    def handler(args):
+        started.set()
+        finish.wait(10)
+        return "ok"
+
+    async def cancelled_call():
+        task = asyncio.ensure_future(executor.call("publish_game", handler, {"path": str(tmp_path)}))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 10)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancelled_call())  # closes the loop with the game lock still held by the worker
+    caplog.set_level(logging.ERROR, logger="concurrent.futures")
+    finish.set()
+    one_worker.submit(lambda: None).result(10)
+    assert "exception calling callback" not in caplog.text
+
+
+def test_cancel_sets_the_flag_seen_by_check_cancelled(tmp_path, one_worker):
+    started, seen = threading.Event(), []
+
+    def handler(args):
+        started.set()
+        for _ in range(200):
+            try:
+                executor.check_cancelled()
+            except executor.Cancelled:
+                seen.append(True)
+                return
+            threading.Event().wait(0.01)
+
+    async def run():
+        task = asyncio.ensure_future(executor.call("create_sprite", handler, {"path": str(tmp_path)}))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 10)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.get_running_loop().run_in_executor(None, lambda: one_worker.submit(lambda: None).result(10))
+
+    asyncio.run(run())
+    assert seen == [True]
@@ -0,0 +1,88 @@
+"""GitHubClient: keep-alive retries only for idempotent methods, network errors as RuntimeError."""
+
+import http.client
+import threading
+
+import pytest
+
+import github_client
+
+
+class StaleConnection:
+    """An idle pooled connection the server has already closed."""
+
+    def __init__(self):
+        self.used = False
+
+    def request(self, *args, **kwargs):
+        self.used = True
+
+    def getresponse(self):
+        raise http.client.RemoteDisconnected("Remote end closed connection without response")
+
+    def close(self):
+        pass
+
+
+def _count_route(counter, body):
+    def route(req):
+        counter.append(req)
+        return 200, {"Content-Type": "application/json"}, body
+    return route
+
+
+def test_get_is_retried_on_a_fresh_connection_after_a_stale_one(gh_stub):
+    hits = []
+    gh_stub.routes[("GET", "/repos/ForkArcade/x")] = _count_route(hits, {"name": "x"})
+    gh = github_client.client()
+    stale = StaleConnection()
+    gh._idle.put_nowait(stale)
+
+    assert gh.get_json("/repos/ForkArcade/x") == {"name": "x"}
+    assert stale.used and len(hits) == 1
+
+
+def test_post_never_uses_an_idle_connection(gh_stub):
+    hits = []
+    gh_stub.routes[("POST", "/repos/ForkArcade/tmpl/generate")] = _count_route(hits, {"clone_url": "u"})
+    gh = github_client.client()
+    stale = StaleConnection()
+    gh._idle.put_nowait(stale)
+
+    assert gh.post("/repos/ForkArcade/tmpl/generate", {"name": "g"}) == {"clone_url": "u"}
+    assert not stale.used and len(hits) == 1
+
+
+def test_post_is_not_resent_when_the_response_is_lost(monkeypatch):
+    gh = github_client.GitHubClient("http://127.0.0.1:9", token="x")
+    sent = []
+
+    def connect(reuse=True):
+        conn = StaleConnection()
+        sent.append(conn)
+        return conn
+
+    monkeypatch.setattr(gh, "_connect", connect)
+    with pytest.raises(RuntimeError, match="request failed"):
+        gh.post("/repos/ForkArcade/tmpl/generate", {"name": "g"})
+    assert len(sent) == 1
+
+
+def test_network_errors_raise_runtime_error():
+    gh = github_client.GitHubClient("http://127.0.0.1:9", token="x")  # nothing listens on the discard port
+    with pytest.raises(RuntimeError) as exc:
+        gh.get_json("/repos/ForkArcade/x")
+    assert not isinstance(exc.value, github_client.GitHubError)
+    assert isinstance(exc.value.__cause__, OSError)
+
+
+def test_request_counters_are_not_lost_across_threads():
+    gh = github_client.GitHubClient("http://127.0.0.1:9", token="x")
+    threads = [threading.Thread(target=lambda: [gh._count("not_modified") for _ in range(2000)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert gh.stats["not_modified"] == 16000
+    gh.stats["not_modified"] = 0  # a copy — callers can't reset the live counters
+    assert gh.stats["not_modified"] == 16000
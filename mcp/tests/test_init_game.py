@@ -0,0 +1,67 @@
+"""init_game clones the generated repo the way `gh repo create --clone` did."""
+
+import json
+import os
+import subprocess
+
+import pytest
+
+from conftest import _git
+from handlers import workflow
+
+TEMPLATE = {"key": "strategy-rpg", "repo": "ForkArcade/game-template-strategy-rpg", "name": "Strategy RPG"}
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch, gh_stub):
+    games = tmp_path / "games"
+    monkeypatch.setattr(workflow, "GAMES_DIR", games)
+    monkeypatch.setattr(workflow, "get_template", lambda key: TEMPLATE if key == TEMPLATE["key"] else None)
+    monkeypatch.setattr(workflow, "get_template_styles", lambda key: None)
+
+    # Two bare repos stand in for the HTTPS and SSH remotes of the generated repo
+    remotes = {}
+    for kind in ("https", "ssh"):
+        remotes[kind] = tmp_path / f"{kind}.git"
+        subprocess.run(["git", "init", "-q", "--bare", str(remotes[kind])], check=True)
+    gh_stub.routes[("POST", f"/repos/{TEMPLATE['repo']}/generate")] = lambda req: (
+        201, {}, {"clone_url": str(remotes["https"]), "ssh_url": str(remotes["ssh"])})
+    gh_stub.routes[("GET", "/repos/ForkArcade/g/topics")] = lambda req: (200, {}, {"names": []})
+    gh_stub.routes[("PUT", "/repos/ForkArcade/g/topics")] = lambda req: (200, {}, {"names": []})
+    return games, remotes
+
+
+def _fake_gh(tmp_path, monkeypatch, protocol):
+    """A `gh` on PATH that answers `gh config get git_protocol`."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    gh = bin_dir / "gh"
+    gh.write_text(f"#!/bin/sh\necho {protocol}\n")
+    gh.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def _without_gh(real_run):
+    def run(cmd, *args, **kwargs):
+        if cmd[0] == "gh":
+            raise FileNotFoundError("gh")
+        return real_run(cmd, *args, **kwargs)
+    return run
+
+
+@pytest.mark.parametrize("protocol", ["ssh", "https"])
+def test_origin_follows_gh_git_protocol(env, tmp_path, monkeypatch, protocol):
+    games, remotes = env
+    _fake_gh(tmp_path, monkeypatch, protocol)
+
+    result = json.loads(workflow.init_game({"slug": "g", "template": TEMPLATE["key"], "title": "G"}))
+    assert result["ok"], result
+    assert _git(games / "g", "remote", "get-url", "origin") == str(remotes[protocol])
+
+
+def test_https_without_gh(env, monkeypatch):
+    games, remotes = env
+    monkeypatch.setattr(workflow.subprocess, "run", _without_gh(subprocess.run))
+
+    json.loads(workflow.init_game({"slug": "g", "template": TEMPLATE["key"], "title": "G"}))
+    assert _git(games / "g", "remote", "get-url", "origin") == str(remotes["https"])
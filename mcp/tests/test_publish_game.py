@@ -0,0 +1,49 @@
+"""publish_game: push and repo settings run together; both are always reported."""
+
+import json
+
+import pytest
+
+from conftest import _git
+from handlers import workflow
+
+REPO = "/repos/ForkArcade/g"
+
+
+@pytest.fixture
+def game(game_repo, gh_stub):
+    (game_repo / "index.html").write_text('<script src="game.js"></script>\n')
+    (game_repo / "game.js").write_text("start()\n")
+    _git(game_repo, "add", "-A")
+    _git(game_repo, "commit", "-qm", "game")
+    _git(game_repo, "push", "-q")
+    gh_stub.routes[("POST", f"{REPO}/pages")] = lambda req: (409, {}, {"message": "Pages already exists"})
+    gh_stub.routes[("GET", f"{REPO}/topics")] = lambda req: (200, {}, {"names": []})
+    gh_stub.routes[("PUT", f"{REPO}/topics")] = lambda req: (200, {}, {"names": []})
+    gh_stub.routes[("PATCH", REPO)] = lambda req: (500, {}, {"message": "boom"})
+    return game_repo
+
+
+def _publish(game):
+    return json.loads(workflow.publish_game({"path": str(game), "slug": "g", "title": "G", "description": "d"}))
+
+
+def test_success_reports_push_and_settings(game):
+    result = _publish(game)
+    assert result["ok"]
+    assert "Pushed to GitHub" in result["results"]
+    assert "GitHub Pages already enabled" in result["results"]
+    assert any(r.startswith("Description skipped:") for r in result["results"])
+    assert _git(game, "rev-parse", "HEAD") == _git(game, "rev-parse", "origin/main")
+
+
+def test_failed_push_still_reports_settings_results(game):
+    _git(game, "remote", "set-url", "origin", str(game.parent / "missing.git"))
+    result = _publish(game)
+
+    assert result["error"]
+    assert "Push failed — version v1 rolled back" in result["results"]
+    assert "GitHub Pages already enabled" in result["results"]
+    assert "Topics: forkarcade-game, strategy-rpg" in result["results"]
+    assert any(r.startswith("Description skipped:") for r in result["results"])
+    assert json.loads((game / ".forkarcade.json").read_text())["currentVersion"] == 0
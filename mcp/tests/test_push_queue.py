@@ -0,0 +1,55 @@
+"""push_queue against a local bare remote: coalescing and flush."""
+
+import pytest
+
+import push_queue
+from conftest import _git
+
+
+@pytest.fixture
+def queue(game_repo, monkeypatch):
+    monkeypatch.setattr(push_queue, "PUSH_DELAY", 30)  # nothing commits until flushed
+    yield game_repo
+    push_queue.discard(game_repo)
+
+
+def _remote_log(game):
+    return _git(game.parent.parent / "remote.git", "log", "--format=%s", "main").splitlines()
+
+
+def test_updates_coalesce_into_one_commit_and_push(queue):
+    for i, name in enumerate(["a.png", "b.png", "a.png"]):
+        (queue / name).write_text(f"v{i}")
+        state = push_queue.enqueue(queue, [name], "Update thumbnail")
+        assert state["state"] == "queued"
+    (queue / "c.json").write_text("{}")
+    state = push_queue.enqueue(queue, ["c.json"], "Update meta")
+    assert state["pending"] == {"files": ["a.png", "b.png", "c.json"], "updates": 4}
+
+    state = push_queue.flush(queue)
+    assert state["state"] == "pushed"
+    assert state["last"]["updates"] == 4
+    assert _remote_log(queue) == ["Update thumbnail; Update meta", "init"]
+    assert (queue / "a.png").read_text() == "v2"
+    assert _git(queue, "show", "origin/main:a.png") == "v2"
+    assert _git(queue, "status", "--porcelain") == ""
+
+
+def test_unchanged_files_push_nothing_new(queue):
+    state = push_queue.flush(push_queue.enqueue(queue, [".forkarcade.json"], "Update thumbnail")["path"])
+    assert state["state"] == "committed"
+    assert _remote_log(queue) == ["init"]
+
+
+def test_push_failure_is_reported_and_the_commit_kept(queue):
+    _git(queue, "remote", "set-url", "origin", str(queue.parent / "missing.git"))
+    (queue / "a.png").write_text("x")
+    push_queue.enqueue(queue, ["a.png"], "Update thumbnail")
+
+    state = push_queue.flush(queue)
+    assert state["state"] == "failed" and state["last"]["error"]
+    assert _git(queue, "log", "-1", "--format=%s") == "Update thumbnail"
+
+
+def test_flush_without_queue_is_idle(tmp_path):
+    assert push_queue.flush(tmp_path)["state"] == "idle"
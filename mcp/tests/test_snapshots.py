@@ -0,0 +1,43 @@
+"""Content-addressed snapshots: layout served by GitHub Pages and blob reuse."""
+
+import re
+
+import snapshots
+
+INDEX = '<script src="forkarcade-sdk.js"></script><script src="game.js?v=1"></script><link href="./style.css" rel="stylesheet">'
+
+
+def _game(tmp_path, game_js="let x = 1;"):
+    (tmp_path / "index.html").write_text(INDEX)
+    (tmp_path / "game.js").write_text(game_js)
+    (tmp_path / "forkarcade-sdk.js").write_text("// sdk")
+    (tmp_path / "style.css").write_text("body {}")
+    return ["index.html", "game.js", "forkarcade-sdk.js", "style.css", "missing.js"]
+
+
+def test_index_references_resolve_and_no_path_is_hidden_from_jekyll(tmp_path):
+    names = _game(tmp_path)
+    manifest, _ = snapshots.write_snapshot(tmp_path, 1, names)
+    assert set(manifest["files"]) == {"index.html", "game.js", "forkarcade-sdk.js", "style.css"}
+
+    version_dir = tmp_path / "versions" / "v1"
+    refs = re.findall(r'(?:src|href)="([^"]+)"', (version_dir / "index.html").read_text())
+    assert len(refs) == 3
+    for ref in refs:
+        assert "?" not in ref and (version_dir / ref).is_file()
+
+    stored = [p.relative_to(tmp_path) for p in (tmp_path / "versions").rglob("*")]
+    assert not [p for p in stored if any(part.startswith("_") for part in p.parts)]
+    assert not [p for p in stored if p.parts[1] == snapshots.BLOBS_DIR and p.name == "index.html"]
+
+
+def test_unchanged_files_are_shared_between_versions(tmp_path):
+    names = _game(tmp_path)
+    snapshots.write_snapshot(tmp_path, 1, names)
+    (tmp_path / "game.js").write_text("let x = 2;")
+    v2, stats = snapshots.write_snapshot(tmp_path, 2, names)
+
+    assert stats == {"new_blobs": 1, "new_bytes": len("let x = 2;"), "reused_blobs": 2}
+    diff = snapshots.diff_manifests(snapshots.read_manifest(tmp_path, 1), v2)
+    assert [c["file"] for c in diff["changed"]] == ["game.js"]
+    assert diff["unchanged"] == 3
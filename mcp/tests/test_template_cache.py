@@ -0,0 +1,65 @@
+"""On-disk GitHub cache: ETag revalidation and offline fallback (github_templates._gh_cached)."""
+
+import json
+
+import pytest
+
+import github_client
+import github_templates
+
+
+@pytest.fixture(autouse=True)
+def disk_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(github_templates, "_DISK_CACHE_DIR", tmp_path / "github")
+    return tmp_path / "github"
+
+
+def _etag_route(body, etag='"v1"'):
+    def route(req):
+        if req["headers"].get("if-none-match") == etag:
+            return 304, {"ETag": etag}, None
+        return 200, {"ETag": etag, "Content-Type": "application/json"}, body
+    return route
+
+
+def test_revalidates_with_etag_and_reuses_body_on_304(gh_stub, disk_cache):
+    gh_stub.routes[("GET", "/repos/ForkArcade/t/contents/_assets.json")] = _etag_route({"palette": ["#fff"]})
+
+    assert github_templates._gh_cached("/repos/ForkArcade/t/contents/_assets.json") == {"palette": ["#fff"]}
+    entry = json.loads(next(disk_cache.glob("*.json")).read_text())
+    assert entry["etag"] == '"v1"'
+    assert "if-none-match" not in gh_stub.requests[0]["headers"]
+
+    assert github_templates._gh_cached("/repos/ForkArcade/t/contents/_assets.json") == {"palette": ["#fff"]}
+    assert gh_stub.requests[1]["headers"]["if-none-match"] == '"v1"'
+    assert github_client.client().stats["not_modified"] == 1
+
+
+def test_changed_etag_replaces_cached_body(gh_stub, disk_cache):
+    path = "/repos/ForkArcade/t/contents/_assets.json"
+    gh_stub.routes[("GET", path)] = _etag_route({"v": 1}, '"v1"')
+    github_templates._gh_cached(path)
+    gh_stub.routes[("GET", path)] = _etag_route({"v": 2}, '"v2"')
+
+    assert github_templates._gh_cached(path) == {"v": 2}
+    assert json.loads(next(disk_cache.glob("*.json")).read_text())["etag"] == '"v2"'
+
+
+def test_serves_stale_copy_when_github_is_unreachable(gh_stub, monkeypatch):
+    path = "/repos/ForkArcade/t/contents/_assets.json"
+    gh_stub.routes[("GET", path)] = _etag_route({"palette": ["#000"]})
+    github_templates._gh_cached(path)
+
+    monkeypatch.setattr(github_client, "_client", github_client.GitHubClient("http://127.0.0.1:9", token="x"))
+    assert github_templates._gh_cached(path) == {"palette": ["#000"]}
+
+
+def test_404_is_not_masked_by_cache(gh_stub):
+    path = "/repos/ForkArcade/t/contents/_assets.json"
+    gh_stub.routes[("GET", path)] = _etag_route({"palette": []})
+    github_templates._gh_cached(path)
+    del gh_stub.routes[("GET", path)]
+
+    with pytest.raises(github_client.GitHubError) as exc:
+        github_templates._gh_cached(path)
+    assert exc.value.status == 404
@@ -0,0 +1,86 @@
+"""create_thumbnail raster backends: "numpy" must render the same bytes as "pil"."""
+
+import json
+
+import pytest
+
+from handlers import thumbnail
+
+pytestmark = pytest.mark.skipif(thumbnail.np is None, reason="numpy not installed")
+
+SPRITES = {
+    "units": {
+        "knight": {
+            "palette": {"1": "#c0c0c0", "2": "#802020"},
+            "origin": [1, 1],
+            "frames": [[".11.", "1221", "1221", ".11."], ["1..1", ".22.", ".22.", "1..1"]],
+        },
+        "ghost": {  # translucent colors take the per-color mask path when scaled
+            "palette": {"1": "#ffffff80", "2": "#00ff0040"},
+            "frames": [["121", "212", "121"]],
+        },
+    },
+}
+
+OPS = {
+    "rect": [{"rect": {"x": 3, "y": 2, "w": 20, "h": 9, "color": "#336699"}},
+             {"rect": {"x": -4, "y": 20, "w": 90, "h": 30, "color": "#ff000080"}}],
+    "circle": [{"circle": {"cx": 20, "cy": 16, "r": 9, "color": "#22aa44", "outline": "#000", "width": 2}},
+               {"circle": {"cx": 60, "cy": 30, "r": 12, "outline": "#ffff0099"}}],
+    "line": [{"line": {"x1": 0, "y1": 0, "x2": 71, "y2": 31, "color": "#fff"}},
+             {"line": {"x1": 5, "y1": 30, "x2": 70, "y2": 4, "color": "#00f8", "width": 3}}],
+    "polygon": [{"polygon": {"points": [[4, 4], [40, 8], [30, 28], [2, 20]], "color": "#884400", "outline": "#fc0", "width": 2}},
+                {"triangle": {"points": [[50, 2], [70, 30], [36, 30]], "color": "#0ff6"}}],
+    "text": [{"pixel_text": {"text": "Score 42", "x": 2, "y": 2, "color": "#ff0"}},
+             {"pixel_text": {"text": "GO", "x": 36, "y": 14, "scale": 2, "shadow": "#0008", "align": "center"}}],
+    "sprite": [{"sprite": {"category": "units", "name": "knight", "x": 5, "y": 5}},
+               {"sprite": {"category": "units", "name": "knight", "frame": 1, "x": 20, "y": 10, "scale": 3}},
+               {"sprite": {"category": "units", "name": "ghost", "x": 44, "y": 4, "scale": 4}},
+               {"sprite": {"category": "units", "name": "ghost", "x": 68, "y": 29}}],
+    "noise": [{"dither": {"color": "#444", "density": 0.4, "seed": 7}},
+              {"dither": {"x": -10, "y": 5, "w": 40, "h": 40, "color": "#f0f8"}},
+              {"scatter": {"color": "#fff", "count": 60, "seed": 3}},
+              {"scatter": {"x": 50, "y": -5, "w": 40, "h": 20, "color": "#0f0", "count": 30}},
+              {"pixels": {"x": 66, "y": 27, "palette": {"a": "#f00", "b": "#00f8"}, "rows": ["ab.a", "b", "aaaaaa"]}}],
+    "gradient": [{"gradient": {"from": "#000033", "to": "#6688ff"}},
+                 {"gradient": {"x": 10, "y": 4, "w": 30, "h": 20, "from": "#ff000000", "to": "#ffff00ff", "direction": "horizontal"}}],
+    "hex_grid": [{"hex_grid": {"cols": 6, "rows": 4, "hex_size": 4, "x": 1, "y": 1, "outline": "#222",
+                               "terrain": [["grass", "water", "?"], ["water"]], "colors": {"grass": "#3a6", "water": "#36c"}}},
+                 {"hex_grid": {"cols": 4, "rows": 3, "hex_size": 5, "x": 36, "y": 2, "outline": "#fff8", "outline_width": 2}}],
+}
+
+# (layer res, opacity) — res other than the output size exercises the resize
+VARIANTS = [
+    pytest.param(None, 1.0, id="native"),
+    pytest.param(None, 0.55, id="opacity"),
+    pytest.param([36, 16], 1.0, id="upscaled"),
+    pytest.param([144, 64], 0.3, id="downscaled-opacity"),
+]
+
+
+@pytest.fixture
+def game(tmp_path, monkeypatch):
+    (tmp_path / "_sprites.json").write_text(json.dumps(SPRITES))
+    # Same layer spec under both backends — the render cache must not answer
+    monkeypatch.setattr(thumbnail, "_render_cache_get", lambda key: None)
+    monkeypatch.setattr(thumbnail, "_render_cache_put", lambda *args, **kwargs: None)
+    return tmp_path
+
+
+def _render(monkeypatch, layer, game_path, backend):
+    monkeypatch.setattr(thumbnail, "BACKEND", backend)
+    image, warnings, _ = thumbnail._render_layer(layer, 72, 32, game_path)
+    return image.tobytes(), warnings
+
+
+@pytest.mark.parametrize("res,opacity", VARIANTS)
+@pytest.mark.parametrize("op_type", list(OPS))
+def test_numpy_backend_matches_pil(game, monkeypatch, op_type, res, opacity):
+    layer = {"ops": OPS[op_type], "opacity": opacity}
+    if res:
+        layer["res"] = res
+    pil, pil_warnings = _render(monkeypatch, layer, game, "pil")
+    fast, fast_warnings = _render(monkeypatch, layer, game, "numpy")
+    assert fast == pil
+    assert fast_warnings == pil_warnings
+    assert any(pil), "layer rendered nothing — the comparison would be vacuous"
@@ -0,0 +1,61 @@
+"""create_thumbnail extra outputs: stale files and the .forkarcade.json record reach git cleanly."""
+
+import json
+
+import pytest
+
+import push_queue
+from conftest import _git
+from handlers import thumbnail
+
+LAYERS = [{"ops": [{"fill": "#123"}, {"rect": {"x": 2, "y": 2, "w": 8, "h": 4, "color": "#fc0"}}]}]
+
+
+@pytest.fixture(autouse=True)
+def no_delay(tmp_path, monkeypatch):
+    monkeypatch.setattr(push_queue, "PUSH_DELAY", 0)
+    monkeypatch.setattr(thumbnail, "_RENDER_CACHE_DIR", tmp_path / "render-cache")
+
+
+def _thumbnail(game, **args):
+    result, _ = thumbnail.create_thumbnail({"path": str(game), "layers": LAYERS, "wait": True, **args})
+    return json.loads(result)
+
+
+def _committed(game):
+    return set(_git(game, "ls-tree", "--name-only", "HEAD").split())
+
+
+def test_untracked_stale_output_does_not_fail_the_push(game_repo):
+    config = json.loads((game_repo / ".forkarcade.json").read_text())
+    config["thumbnails"] = [{"file": "_thumbnail-144x64.png", "w": 144, "h": 64, "format": "png"}]
+    (game_repo / ".forkarcade.json").write_text(json.dumps(config))
+    _git(game_repo, "commit", "-qam", "record a size that was never committed")
+
+    result = _thumbnail(game_repo, outputs=[{"w": 36, "h": 16}])
+    assert result["push"]["state"] == "pushed", result["push"]
+    assert {"_thumbnail.png", "_thumbnail-36x16.png", ".forkarcade.json"} <= _committed(game_repo)
+    assert _git(game_repo, "status", "--porcelain") == ""
+
+
+def test_removed_output_is_deleted_in_the_commit(game_repo):
+    _thumbnail(game_repo, outputs=[{"w": 36, "h": 16}, {"w": 144, "h": 64, "format": "webp"}])
+    assert "_thumbnail-144x64.webp" in _committed(game_repo)
+
+    result = _thumbnail(game_repo, outputs=[{"w": 36, "h": 16}])
+    assert result["push"]["state"] == "pushed"
+    assert "_thumbnail-144x64.webp" not in _committed(game_repo)
+    assert _git(game_repo, "rev-parse", "HEAD") == _git(game_repo, "rev-parse", "origin/main")
+
+
+def test_other_config_edits_are_not_swept_into_the_commit(game_repo):
+    config = json.loads((game_repo / ".forkarcade.json").read_text())
+    config["title"] = "work in progress"
+    (game_repo / ".forkarcade.json").write_text(json.dumps(config))
+
+    result = _thumbnail(game_repo, outputs=[{"w": 36, "h": 16}])
+    assert any("other uncommitted changes" in w for w in result["warnings"])
+    committed = json.loads(_git(game_repo, "show", "HEAD:.forkarcade.json"))
+    assert "title" not in committed and "thumbnails" not in committed
+    saved = json.loads((game_repo / ".forkarcade.json").read_text())
+    assert saved["title"] == "work in progress" and len(saved["thumbnails"]) == 2
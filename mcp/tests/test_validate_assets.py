@@ -0,0 +1,52 @@
+"""validate_assets reads the shared sprite store under its lock."""
+
+import json
+import pytest
+
+import context
+from handlers import assets
+from sprites import sprite_store
+
+GUIDE = {"categories": {"units": {"sprites": ["knight", "archer"]}}}
+
+
+@pytest.fixture
+def game(tmp_path, monkeypatch):
+    monkeypatch.setattr(context, "GAMES_DIR", tmp_path)
+    monkeypatch.setattr(assets, "get_template_assets", lambda template: GUIDE)
+    path = tmp_path / "g"
+    path.mkdir()
+    sprite = {"w": 1, "h": 1, "palette": {"1": "#fff"}, "frames": [["1"]], "origin": [0, 0]}
+    (path / "_sprites.json").write_text(json.dumps({"units": {"knight": sprite}}))
+    return path
+
+
+def test_reports_found_and_missing(game):
+    result = json.loads(assets.validate_assets({"path": str(game), "template": "t"}))
+    assert result["categories"]["units"] == {"found": ["knight"], "missing": ["archer"]}
+    assert not result["complete"] and result["format_errors"] == []
+
+
+class _LockCheckedDict(dict):
+    """Sprite data that records whether the store lock was held on each read."""
+
+    def __init__(self, data, lock):
+        super().__init__(data)
+        self.lock = lock
+        self.reads = []
+
+    def get(self, *args):
+        self.reads.append(self.lock._is_owned())
+        return super().get(*args)
+
+    def items(self):
+        self.reads.append(self.lock._is_owned())
+        return super().items()
+
+
+def test_reads_sprites_under_the_store_lock(game):
+    # create_sprite(s) mutate this dict in place under store.lock from other pool threads
+    store = sprite_store(game)
+    store._data = checked = _LockCheckedDict(store.data, store.lock)
+    json.loads(assets.validate_assets({"path": str(game), "template": "t"}))
+    assert checked.reads and all(checked.reads)
@@ -63,8 +63,8 @@ const banner = [
   `  ${YELLOW}MCP Tools${RESET}`,
   `  ${DIM}Workflow:${RESET}      list_templates  init_game  validate_game  publish_game`,
   `  ${DIM}             ${RESET} get_sdk_docs  get_game_prompt  update_sdk  list_evolve_issues`,
-  `  ${DIM}Assets:${RESET}       get_asset_guide  create_sprite  validate_assets  preview_assets`,
-  `  ${DIM}Other:${RESET}        get_versions  create_thumbnail`,
+  `  ${DIM}Assets:${RESET}       get_asset_guide  create_sprite  create_sprites  validate_assets  preview_assets`,
+  `  ${DIM}Other:${RESET}        get_versions  create_thumbnail  get_push_status  get_cache_stats`,
   '',
 ]
 